@@ -1,33 +1,87 @@
-from flask import Flask, render_template_string, request, jsonify, session, redirect, url_for, send_file
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for, send_file, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_socketio import SocketIO
 import sqlite3
 from datetime import datetime, timezone, timedelta
 import os
 import hashlib
+import hmac
 import secrets
-from functools import wraps
+from functools import lru_cache, wraps
 import json
 import io
 import requests
 import csv
+import importlib.util
 import time
 import atexit
 import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes with orjson.
+
+    Types orjson doesn't handle natively, such as Decimal values from
+    PostgreSQL, go through Flask's usual default() hook. Naive datetimes
+    (PostgreSQL TIMESTAMP columns hold UTC) are written with an explicit
+    +00:00 offset so browsers don't read them as local time.
+    """
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default,
+                            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'bracket-tracker-2024-secure-key')
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+
+class OrjsonSocketSerializer:
+    """json-module stand-in so Socket.IO encodes event payloads with orjson"""
+    
+    @staticmethod
+    def dumps(obj, **kwargs):
+        # Same naive-datetime-as-UTC handling as OrjsonProvider
+        return orjson.dumps(obj, option=orjson.OPT_NAIVE_UTC).decode('utf-8')
+    
+    @staticmethod
+    def loads(data, **kwargs):
+        return orjson.loads(data)
 
 # Use threading instead of gevent for Render.com compatibility
 socketio = SocketIO(app, 
                    cors_allowed_origins="*", 
                    async_mode='threading',
+                   json=OrjsonSocketSerializer if orjson is not None else json,
                    logger=True,
                    engineio_logger=True)
 
+# Column order of the chat message list sent to the client
+CHAT_MESSAGE_COLUMNS = ('sender', 'message', 'timestamp')
+CHAT_HISTORY_LIMIT = 50
+# Newest CHAT_HISTORY_LIMIT messages (walked backwards on the timestamp/id
+# index), returned oldest first for display
+RECENT_CHAT_MESSAGES_SQL = (
+    f"SELECT {', '.join(CHAT_MESSAGE_COLUMNS)} FROM ("
+    f"SELECT id, {', '.join(CHAT_MESSAGE_COLUMNS)} FROM chat_messages "
+    f"ORDER BY timestamp DESC, id DESC LIMIT {CHAT_HISTORY_LIMIT}"
+    f") AS recent ORDER BY timestamp, id"
+)
+
 # Slack webhook URL for alerts
 SLACK_WEBHOOK_URL = os.environ.get('SLACK_WEBHOOK_URL', '')
 
@@ -66,6 +120,10 @@ ROLES = {
 # Database configuration for persistence
 DATABASE_URL = os.environ.get('DATABASE_URL', 'sqlite:///nzxt_inventory.db')
 
+# Bump when init_database() changes tables, indexes or seed data so existing
+# databases run it again on the next start
+SCHEMA_VERSION = 5
+
 def get_database_path():
     """Get the database path, ensuring it's in a persistent location"""
     if DATABASE_URL.startswith('sqlite:///'):
@@ -77,35 +135,166 @@ def get_database_path():
         # Default SQLite with persistent path
         return 'nzxt_inventory.db'
 
-def get_db_connection():
-    """Get database connection with persistent storage"""
-    db_path = get_database_path()
+# The database flavour is fixed for the life of the process, so it is worked
+# out once here instead of being re-detected on every connection
+DATABASE_PATH = get_database_path()
+IS_POSTGRES = DATABASE_PATH.startswith('postgresql://')
+if IS_POSTGRES and importlib.util.find_spec('psycopg2') is None:
+    logger.warning("PostgreSQL driver not available, falling back to SQLite")
+    IS_POSTGRES = False
+    DATABASE_PATH = 'nzxt_inventory.db'
+
+# Connections are pooled instead of opened per call. PostgreSQL uses a
+# psycopg2 ThreadedConnectionPool; SQLite keeps up to SQLITE_POOL_SIZE idle
+# connections (check_same_thread=False) that any request thread can reuse.
+PG_POOL_MIN = int(os.environ.get('PG_POOL_MIN', 1))
+PG_POOL_MAX = int(os.environ.get('PG_POOL_MAX', 20))
+SQLITE_POOL_SIZE = int(os.environ.get('SQLITE_POOL_SIZE', 8))
+# Compiled statements kept per pooled SQLite connection (sqlite3 default: 128)
+SQLITE_STATEMENT_CACHE = 256
+
+_pg_pool = None
+_pg_pool_lock = threading.Lock()
+# ThreadedConnectionPool raises PoolError once PG_POOL_MAX connections are
+# out; callers wait on this instead so bursts queue rather than fail
+_pg_pool_slots = threading.BoundedSemaphore(PG_POOL_MAX)
+_sqlite_pool = queue.LifoQueue(maxsize=SQLITE_POOL_SIZE)
+
+def _get_pg_pool(dsn):
+    """Create the PostgreSQL pool on first use"""
+    global _pg_pool
+    if _pg_pool is None:
+        with _pg_pool_lock:
+            if _pg_pool is None:
+                import psycopg2.pool
+                # TCP keepalives stop idle pooled connections from being
+                # silently dropped by the hosting provider's load balancer
+                _pg_pool = psycopg2.pool.ThreadedConnectionPool(
+                    PG_POOL_MIN, PG_POOL_MAX, dsn, sslmode='require',
+                    keepalives=1, keepalives_idle=30,
+                    keepalives_interval=10, keepalives_count=5
+                )
+    return _pg_pool
+
+@lru_cache(maxsize=256)
+def _pg_sql(sql):
+    return sql.replace('?', '%s')
+
+class PostgresConnection:
+    """psycopg2 connection with the sqlite3-style execute() the app uses.
+
+    Queries are written once with ``?`` placeholders and translated to
+    psycopg2's ``%s`` here; rows come back from a DictCursor so they support
+    both ``row['name']`` and ``row[0]`` like sqlite3.Row.
+    """
+    def __init__(self, raw):
+        self.raw = raw
     
-    if db_path.startswith('postgresql://'):
-        # PostgreSQL connection
-        try:
-            import psycopg2
-            conn = psycopg2.connect(db_path, sslmode='require')
-            conn.autocommit = False
-            return conn
-        except ImportError:
-            logger.warning("PostgreSQL driver not available, falling back to SQLite")
-            db_path = 'nzxt_inventory.db'
+    def execute(self, sql, params=()):
+        from psycopg2.extras import DictCursor
+        cursor = self.raw.cursor(cursor_factory=DictCursor)
+        cursor.execute(_pg_sql(sql), params)
+        return cursor
+    
+    def executemany(self, sql, seq_of_params):
+        # psycopg2's executemany() is one round trip per row; execute_batch
+        # sends the statements in pages
+        from psycopg2.extras import execute_batch
+        cursor = self.raw.cursor()
+        execute_batch(cursor, _pg_sql(sql), seq_of_params)
+        return cursor
+    
+    def cursor(self):
+        return self.raw.cursor()
     
+    def commit(self):
+        self.raw.commit()
+    
+    def rollback(self):
+        self.raw.rollback()
+
+def _connect_sqlite(db_path):
     # SQLite connection with WAL mode for better concurrency
-    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn = sqlite3.connect(db_path, check_same_thread=False, cached_statements=SQLITE_STATEMENT_CACHE)
     conn.row_factory = sqlite3.Row
     # Enable WAL mode for better performance and concurrency
     conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
     conn.execute('PRAGMA foreign_keys=ON')
     conn.execute('PRAGMA busy_timeout=5000')
+    # Pooled connections live for the whole process, so a larger page cache
+    # and memory-mapped reads pay off across requests
+    conn.execute('PRAGMA temp_store=MEMORY')
+    conn.execute('PRAGMA cache_size=-65536')
+    conn.execute('PRAGMA mmap_size=268435456')
+    conn.execute('PRAGMA wal_autocheckpoint=1000')
     return conn
 
+def get_db_connection():
+    """Get a pooled database connection; hand it back with release_db_connection()"""
+    if IS_POSTGRES:
+        _pg_pool_slots.acquire()
+        try:
+            raw = _get_pg_pool(DATABASE_PATH).getconn()
+        except Exception:
+            _pg_pool_slots.release()
+            raise
+        raw.autocommit = False
+        return PostgresConnection(raw)
+    
+    try:
+        return _sqlite_pool.get_nowait()
+    except queue.Empty:
+        return _connect_sqlite(DATABASE_PATH)
+
+def fetch_dicts(cursor, size=None):
+    """Rows from ``cursor`` as plain dicts, zipped against the column names
+    read once from cursor.description rather than converting row by row.
+    ``size`` switches to fetchmany() for batched reads.
+    """
+    keys = [column[0] for column in cursor.description]
+    rows = cursor.fetchall() if size is None else cursor.fetchmany(size)
+    return [dict(zip(keys, row)) for row in rows]
+
+def release_db_connection(conn):
+    """Return a connection from get_db_connection() to its pool.
+
+    Any transaction the caller left open is rolled back so the next user
+    starts clean.
+    """
+    if IS_POSTGRES:
+        try:
+            _pg_pool.putconn(conn.raw)
+        finally:
+            _pg_pool_slots.release()
+        return
+    
+    if conn.in_transaction:
+        conn.rollback()
+    try:
+        _sqlite_pool.put_nowait(conn)
+    except queue.Full:
+        conn.close()
+
+def close_db_connections():
+    """Close idle pooled connections (lets SQLite checkpoint its WAL)"""
+    while True:
+        try:
+            conn = _sqlite_pool.get_nowait()
+        except queue.Empty:
+            break
+        # Refresh query planner statistics the way SQLite recommends on close
+        conn.execute('PRAGMA optimize')
+        conn.close()
+    if _pg_pool is not None:
+        _pg_pool.closeall()
+
 def backup_database():
     """Create a backup of the database"""
     try:
-        source_path = get_database_path()
-        if source_path.startswith('postgresql://'):
+        close_db_connections()
+        source_path = DATABASE_PATH
+        if IS_POSTGRES:
             logger.info("PostgreSQL backup requires manual setup")
             return
             
@@ -251,6 +440,12 @@ HTML_TEMPLATE = '''
             align-items: center;
             font-size: 13px;
         }
+        /* Rows outside the viewport skip layout and paint; the intrinsic size
+           keeps the scrollbar stable until they are rendered */
+        .bracket-item:not(.header) {
+            content-visibility: auto;
+            contain-intrinsic-size: auto 42px;
+        }
         .bracket-item.header {
             font-weight: bold;
             background: #e9ecef;
@@ -392,6 +587,8 @@ HTML_TEMPLATE = '''
             margin-bottom: 8px;
             background: white;
             border-radius: 5px;
+            content-visibility: auto;
+            contain-intrinsic-size: auto 160px;
         }
         .work-order-header {
             display: flex;
@@ -1381,6 +1578,7 @@ HTML_TEMPLATE = '''
                     
                     <div class="file-upload">
                         <input type="file" id="csvFile" accept=".csv" style="margin-bottom: 10px;">
+                        <progress id="csvUploadProgress" max="1" value="0" style="display: none; width: 100%; margin-bottom: 10px;"></progress>
                         <button class="btn btn-upload" onclick="uploadCSV()">Upload CSV</button>
                     </div>
                     
@@ -1569,6 +1767,83 @@ HTML_TEMPLATE = '''
         </div>
     </div>
     
+    <!-- Row templates cloned by the list renderers -->
+    <template id="tpl-printing-row">
+        <div class="bracket-item">
+            <div class="bracket-name"></div>
+            <div class="current-qty"></div>
+            <div>
+                <input type="number" class="qty-input" value="0" min="0">
+            </div>
+            <div>
+                <button class="btn-add" data-action="addPrinted">Add</button>
+                <button class="btn-remove" data-action="removePrinted">Remove</button>
+            </div>
+        </div>
+    </template>
+    
+    <template id="tpl-picking-row">
+        <div class="bracket-item">
+            <div class="bracket-name"></div>
+            <div class="current-qty"></div>
+            <div>
+                <input type="number" class="qty-input" value="0" min="0">
+            </div>
+            <div>
+                <button class="btn-remove" data-action="removePicked">Remove</button>
+                <button class="btn-add" data-action="returnPicked">Return</button>
+            </div>
+        </div>
+    </template>
+    
+    <template id="tpl-inventory-row">
+        <div class="bracket-item">
+            <div class="bracket-name"></div>
+            <div class="current-qty"></div>
+            <div>
+                <input type="number" class="qty-input" min="0">
+            </div>
+            <div>
+                <button class="btn" data-action="updateCount">Update</button>
+            </div>
+        </div>
+    </template>
+    
+    <template id="tpl-external-order-row">
+        <div class="external-order-item">
+            <div class="work-order-header">
+                <div class="work-order-title" data-field="external_order_number"></div>
+                <div class="work-order-actions">
+                    <button class="btn-convert" data-action="convertExternalOrder">Convert to Work Order</button>
+                    <button class="btn-complete" data-action="completeExternalOrder">Complete</button>
+                    <button class="btn-delete" data-action="deleteExternalOrder">Delete</button>
+                </div>
+            </div>
+            <div class="external-order-info">
+                <div class="external-order-detail">
+                    <strong>SKU</strong>
+                    <span data-field="sku"></span>
+                </div>
+                <div class="external-order-detail">
+                    <strong>Quantity</strong>
+                    <span data-field="quantity"></span> sets
+                </div>
+                <div class="external-order-detail">
+                    <strong>GPU Brackets</strong>
+                    <span data-field="required_brackets"></span>
+                </div>
+            </div>
+            <div style="margin-top: 6px; font-size: 12px;">
+                <strong>Status:</strong> <span data-field="status"></span> | 
+                <strong>Created:</strong> <span data-field="created_at"></span>
+            </div>
+        </div>
+    </template>
+    
+    <template id="tpl-view-only">
+        <span style="color: #6c757d; font-size: 11px;">View Only</span>
+    </template>
+    
     <!-- Floating Chat Widget -->
     <button class="chat-tab-btn" id="chatToggleBtn" onclick="toggleChatWindow()">
         <svg width="24" height="24" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">
@@ -1602,16 +1877,57 @@ HTML_TEMPLATE = '''
     </div>
     {% endif %}
 
-    <script>
+    <script>window.__SESSION__ = {{ session_bootstrap|tojson }};</script>
+    <script src="{{ url_for('app_script', v=app_script_version) }}"></script>
+</body>
+</html>
+'''
+
+# Client application script. It contains no template markup (per-session values
+# come from window.__SESSION__), so it is served as a separate, long-cached file.
+APP_SCRIPT = '''
         const socket = io();
         let currentInventory = [];
         let workOrders = [];
         let assemblyOrders = [];
-        let currentUserRole = '{{ session.role }}' || 'viewer';
+        let inventoryByType = { H6: [], H7: [], H9: [] };
+        let externalOrders = [];
+        const SESSION = window.__SESSION__;
+        let currentUserRole = SESSION.role || 'viewer';
         let unreadMessages = 0;
         let chatWindowVisible = false;
         let chatMinimized = false;
         
+        // Display order of set types in the work order and set analysis lists
+        const SET_TYPES_ORDER = ['H6', 'H7-282', 'H7-304', 'H9'];
+        
+        // Shared formatters; same output as toLocaleString()/toLocaleDateString()
+        // without building a new locale formatter for every row
+        const DT_FMT = new Intl.DateTimeFormat(undefined, {
+            year: 'numeric', month: 'numeric', day: 'numeric',
+            hour: 'numeric', minute: 'numeric', second: 'numeric'
+        });
+        const D_FMT = new Intl.DateTimeFormat();
+        const TIME_FMT = new Intl.DateTimeFormat([], { hour: '2-digit', minute: '2-digit' });
+        
+        // Rows are re-rendered with the same server timestamps over and over, so
+        // remember the formatted text per raw value (bounded, reset when full)
+        const TIMESTAMP_CACHE_LIMIT = 2000;
+        const timestampCache = new Map();
+        
+        function formatTimestamp(raw, formatter = DT_FMT) {
+            const key = formatter === DT_FMT ? raw : 't|' + raw;
+            let text = timestampCache.get(key);
+            if (text === undefined) {
+                if (timestampCache.size >= TIMESTAMP_CACHE_LIMIT) {
+                    timestampCache.clear();
+                }
+                text = formatter.format(new Date(raw));
+                timestampCache.set(key, text);
+            }
+            return text;
+        }
+        
         // Real-time clock function
         function updateClock() {
             const now = new Date();
@@ -1646,6 +1962,9 @@ HTML_TEMPLATE = '''
             document.getElementById(tabName).classList.add('active');
             event.target.classList.add('active');
             
+            activeTab = tabName;
+            renderActiveTab();
+            
             if (tabName === 'history') {
                 loadHistory();
             } else if (tabName === 'external') {
@@ -1704,44 +2023,68 @@ HTML_TEMPLATE = '''
         }
         
         function loadChatMessages() {
-            fetch('/api/chat_messages')
-                .then(response => response.json())
-                .then(data => {
-                    if (data.success) {
-                        updateChatDisplay(data.messages, 'chatMessages');
+            cachedFetch('/api/chat_messages')
+                .then(({ data, changed }) => {
+                    if (changed && data.success) {
+                        updateChatDisplay(data.cols, data.rows, 'chatMessages');
                     }
                 });
         }
         
-        function updateChatDisplay(messages, containerId) {
+        function createTextDiv(className, text) {
+            const div = document.createElement('div');
+            if (className) div.className = className;
+            div.textContent = text;
+            return div;
+        }
+        
+        // Escape text that still has to be interpolated into an HTML string
+        function escapeHtml(value) {
+            return String(value)
+                .replace(/&/g, '&amp;')
+                .replace(/</g, '&lt;')
+                .replace(/>/g, '&gt;')
+                .replace(/"/g, '&quot;')
+                .replace(/'/g, '&#39;');
+        }
+        
+        // Messages arrive in columnar form: cols names the fields, each row is an array
+        function updateChatDisplay(cols, messages, containerId) {
             const container = document.getElementById(containerId);
-            container.innerHTML = '';
             
             if (messages.length === 0) {
                 container.innerHTML = '<div class="chat-message message-system">No messages yet. Start the conversation!</div>';
                 return;
             }
             
-            messages.forEach(message => {
-                const messageTime = new Date(message.timestamp).toLocaleTimeString([], {hour: '2-digit', minute:'2-digit'});
+            const fragment = document.createDocumentFragment();
+            const senderIdx = cols.indexOf('sender');
+            const messageIdx = cols.indexOf('message');
+            const timestampIdx = cols.indexOf('timestamp');
+            
+            messages.forEach(row => {
+                const sender = row[senderIdx];
+                const messageTime = formatTimestamp(row[timestampIdx], TIME_FMT);
                 let messageClass = 'message-received';
                 
-                if (message.sender === 'System') {
+                if (sender === 'System') {
                     messageClass = 'message-system';
-                } else if (message.sender === '{{ session.username }}') {
+                } else if (sender === SESSION.username) {
                     messageClass = 'message-sent';
                 }
                 
-                container.innerHTML += `
-                    <div class="chat-message ${messageClass}">
-                        ${message.sender !== 'System' && message.sender !== '{{ session.username }}' ? 
-                            `<div class="message-sender">${message.sender}</div>` : ''}
-                        <div>${message.message}</div>
-                        <div class="message-time">${messageTime}</div>
-                    </div>
-                `;
+                const bubble = document.createElement('div');
+                bubble.className = `chat-message ${messageClass}`;
+                if (messageClass === 'message-received') {
+                    bubble.appendChild(createTextDiv('message-sender', sender));
+                }
+                bubble.appendChild(createTextDiv('', row[messageIdx]));
+                bubble.appendChild(createTextDiv('message-time', messageTime));
+                fragment.appendChild(bubble);
             });
             
+            container.replaceChildren(fragment);
+            
             // Scroll to bottom
             container.scrollTop = container.scrollHeight;
         }
@@ -1753,7 +2096,7 @@ HTML_TEMPLATE = '''
             if (message) {
                 socket.emit('chat_message', {
                     message: message,
-                    sender: '{{ session.username }}'
+                    sender: SESSION.username
                 });
                 
                 input.value = '';
@@ -1769,7 +2112,7 @@ HTML_TEMPLATE = '''
         // Socket events for chat
         socket.on('chat_message', (data) => {
             incrementUnreadCount();
-            loadChatMessages(); // Reload messages to ensure consistency
+            scheduleReload(loadChatMessages); // Reload messages to ensure consistency
         });
         
         socket.on('system_notification', (data) => {
@@ -1786,7 +2129,7 @@ HTML_TEMPLATE = '''
             // Create alert element
             const alert = document.createElement('div');
             alert.className = `system-alert ${type}`;
-            alert.innerHTML = message;
+            alert.textContent = message;
             
             // Add to top of container
             const container = document.querySelector('.container');
@@ -1817,12 +2160,7 @@ HTML_TEMPLATE = '''
             const username = document.getElementById('username').value;
             const password = document.getElementById('password').value;
             
-            fetch('/api/login', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ username, password })
-            })
-            .then(response => response.json())
+            postJson('/api/login', { username, password })
             .then(data => {
                 if (data.success) {
                     window.location.reload();
@@ -1852,112 +2190,389 @@ HTML_TEMPLATE = '''
             document.getElementById('status').className = 'status-value status-disconnected';
         });
         
+        // A rejected change means our optimistic update was wrong; pull fresh state
+        socket.on('error', (data) => {
+            alert('Error: ' + data.message);
+            scheduleReload(requestInventory);
+        });
+        
+        // Trailing-edge coalescing for refetches: repeated requests for the same
+        // loader within the window collapse into a single call
+        const reloadTimers = new Map();
+        
+        function scheduleReload(loader, delay = 100) {
+            if (reloadTimers.has(loader)) return;
+            reloadTimers.set(loader, setTimeout(() => {
+                reloadTimers.delete(loader);
+                loader();
+            }, delay));
+        }
+        
+        function requestInventory() {
+            socket.emit('get_inventory');
+        }
+        
+        // Coalesce bursts of inventory updates so at most one render happens per frame
+        let pendingInventoryData = null;
+        let inventoryRenderFrame = 0;
+
         socket.on('inventory_update', (data) => {
-            currentInventory = data.items;
-            workOrders = data.work_orders || [];
-            assemblyOrders = data.assembly_orders || [];
-            updateAllInventoryDisplays(data.items);
-            updateWorkOrderDisplay();
-            updateAssemblyDisplay();
-            updateSetAnalysis();
+            pendingInventoryData = pendingInventoryData ? { ...pendingInventoryData, ...data } : data;
+            if (inventoryRenderFrame) return;
+
+            inventoryRenderFrame = requestAnimationFrame(() => {
+                const latest = pendingInventoryData;
+                pendingInventoryData = null;
+                inventoryRenderFrame = 0;
+
+                applyInventorySnapshot(latest);
+            });
+        });
+        
+        socket.on('inventory_item:update', ({ id, quantity }) => {
+            const item = currentInventory.find(i => i.id === id);
+            if (!item) {
+                scheduleReload(requestInventory);
+                return;
+            }
+            item.quantity = quantity;
+            invalidateTabs();
         });
         
-        // Update inventory displays on all tabs
-        function updateAllInventoryDisplays(items) {
-            updatePrintingStation(items);
-            updatePickingStation(items);
-            updateInventoryManagement(items);
+        // Updates may carry only the scopes that changed; keep the rest as is
+        function applyInventorySnapshot(data) {
+            if (data.items) {
+                currentInventory = data.items;
+                inventoryByType = partitionByCaseType(currentInventory);
+            }
+            if (data.work_orders) workOrders = data.work_orders;
+            if (data.assembly_orders) assemblyOrders = data.assembly_orders;
+            invalidateTabs();
         }
         
-        // Printing Station - Add and remove functionality
-        function updatePrintingStation(items) {
-            updateBracketList('h6-printing-list', items.filter(item => item.case_type === 'H6'), 'printing');
-            updateBracketList('h7-printing-list', items.filter(item => item.case_type === 'H7'), 'printing');
-            updateBracketList('h9-printing-list', items.filter(item => item.case_type === 'H9'), 'printing');
+        // Mutating endpoints may return the updated snapshot with their reply;
+        // use it directly and only ask the server for one when it is missing
+        function refreshFromResponse(data) {
+            if (data.items) {
+                applyInventorySnapshot(data);
+            } else {
+                scheduleReload(requestInventory);
+            }
         }
         
-        // Picking Station - With work order context
-        function updatePickingStation(items) {
-            updateBracketList('h6-picking-list', items.filter(item => item.case_type === 'H6'), 'picking');
-            updateBracketList('h7-picking-list', items.filter(item => item.case_type === 'H7'), 'picking');
-            updateBracketList('h9-picking-list', items.filter(item => item.case_type === 'H9'), 'picking');
+        // Only the visible tab is rendered on each update; the others are marked
+        // dirty and rendered when the user switches to them
+        let activeTab = 'printing';
+        const dirtyTabs = { printing: false, picking: false, assembly: false, inventory: false };
+        
+        const TAB_RENDERERS = {
+            printing: () => updatePrintingStation(inventoryByType),
+            picking: () => {
+                updatePickingStation(inventoryByType);
+                updateWorkOrderDisplay();
+            },
+            assembly: () => updateAssemblyDisplay(),
+            inventory: () => {
+                updateInventoryManagement(inventoryByType);
+                updateSetAnalysis();
+            }
+        };
+        
+        function invalidateTabs() {
+            for (const tabName in dirtyTabs) {
+                dirtyTabs[tabName] = true;
+            }
+            renderActiveTab();
+        }
+        
+        function renderActiveTab() {
+            if (dirtyTabs[activeTab]) {
+                dirtyTabs[activeTab] = false;
+                TAB_RENDERERS[activeTab]();
+            }
         }
         
+        // Split items by case type in a single pass
+        function partitionByCaseType(items) {
+            const byType = { H6: [], H7: [], H9: [] };
+            for (let i = 0; i < items.length; i++) {
+                const bucket = byType[items[i].case_type];
+                if (bucket) bucket.push(items[i]);
+            }
+            return byType;
+        }
+
+        // Printing Station - Add and remove functionality
+        function updatePrintingStation(byType) {
+            updateBracketList('h6-printing-list', byType.H6, 'printing');
+            updateBracketList('h7-printing-list', byType.H7, 'printing');
+            updateBracketList('h9-printing-list', byType.H9, 'printing');
+        }
+
+        // Picking Station - With work order context
+        function updatePickingStation(byType) {
+            updateBracketList('h6-picking-list', byType.H6, 'picking');
+            updateBracketList('h7-picking-list', byType.H7, 'picking');
+            updateBracketList('h9-picking-list', byType.H9, 'picking');
+        }
+
         // Inventory Management
-        function updateInventoryManagement(items) {
-            updateBracketList('h6-inventory-list', items.filter(item => item.case_type === 'H6'), 'inventory');
-            updateBracketList('h7-inventory-list', items.filter(item => item.case_type === 'H7'), 'inventory');
-            updateBracketList('h9-inventory-list', items.filter(item => item.case_type === 'H9'), 'inventory');
+        function updateInventoryManagement(byType) {
+            updateBracketList('h6-inventory-list', byType.H6, 'inventory');
+            updateBracketList('h7-inventory-list', byType.H7, 'inventory');
+            updateBracketList('h9-inventory-list', byType.H9, 'inventory');
+        }
+        
+        // Mounted bracket rows per container, keyed by item id:
+        // containerId -> Map(itemId -> {node, lastQty, lastClass, lastName})
+        const bracketRowCache = new Map();
+
+        function getStockClass(item) {
+            return item.quantity <= 0 ? 'critical' : item.quantity <= item.min_stock ? 'low-stock' : '';
         }
+
+        const BRACKET_ROW_TEMPLATES = {
+            printing: 'tpl-printing-row',
+            picking: 'tpl-picking-row',
+            inventory: 'tpl-inventory-row'
+        };
         
+        const QTY_INPUT_PREFIXES = {
+            printing: 'print-qty-',
+            picking: 'pick-qty-',
+            inventory: 'actual-qty-'
+        };
+        
+        // Clone the station's row template and fill in the item fields
+        function createBracketRow(item, stationType, isViewer) {
+            const template = document.getElementById(BRACKET_ROW_TEMPLATES[stationType]);
+            const row = template.content.firstElementChild.cloneNode(true);
+            
+            row.querySelector('.bracket-name').textContent = item.description || item.name;
+            row.querySelector('.current-qty').textContent = item.quantity;
+            
+            const input = row.querySelector('.qty-input');
+            input.id = QTY_INPUT_PREFIXES[stationType] + item.id;
+            if (stationType === 'inventory') {
+                input.value = item.quantity;
+            }
+            
+            const actions = row.lastElementChild;
+            if (isViewer) {
+                input.disabled = true;
+                actions.replaceChildren(document.getElementById('tpl-view-only').content.cloneNode(true));
+            } else {
+                actions.querySelectorAll('button[data-action]').forEach(button => {
+                    button.dataset.id = item.id;
+                });
+            }
+            
+            return row;
+        }
+
+        // Keyed diff: only patch rows whose quantity/stock level changed instead of
+        // rebuilding the whole list (keeps focus and typed values in the inputs)
         function updateBracketList(containerId, items, stationType) {
             const container = document.getElementById(containerId);
-            container.innerHTML = '';
-            
+            let rows = bracketRowCache.get(containerId);
+            if (!rows) {
+                rows = new Map();
+                bracketRowCache.set(containerId, rows);
+                container.innerHTML = '';
+            }
+
+            const isViewer = currentUserRole === 'viewer';
+            const seen = new Set();
+            const fragment = document.createDocumentFragment();
+
             items.forEach(item => {
-                const stockClass = item.quantity <= 0 ? 'critical' : item.quantity <= item.min_stock ? 'low-stock' : '';
-                const isViewer = currentUserRole === 'viewer';
+                const stockClass = getStockClass(item);
+                const name = item.description || item.name;
+                seen.add(item.id);
+
+                let row = rows.get(item.id);
+                if (!row) {
+                    row = {
+                        node: createBracketRow(item, stationType, isViewer),
+                        lastQty: item.quantity,
+                        lastClass: stockClass,
+                        lastName: name
+                    };
+                    row.node.classList.toggle('critical', stockClass === 'critical');
+                    row.node.classList.toggle('low-stock', stockClass === 'low-stock');
+                    rows.set(item.id, row);
+                    fragment.appendChild(row.node);
+                    return;
+                }
+
+                if (row.lastQty !== item.quantity) {
+                    row.node.querySelector('.current-qty').textContent = item.quantity;
+                    if (stationType === 'inventory') {
+                        // The actual-count input mirrors the current quantity; leave it alone while the user is typing
+                        const input = row.node.querySelector('.qty-input');
+                        if (input !== document.activeElement) {
+                            input.value = item.quantity;
+                        }
+                    }
+                    row.lastQty = item.quantity;
+                }
+
+                if (row.lastClass !== stockClass) {
+                    row.node.classList.toggle('critical', stockClass === 'critical');
+                    row.node.classList.toggle('low-stock', stockClass === 'low-stock');
+                    row.lastClass = stockClass;
+                }
+
+                if (row.lastName !== name) {
+                    row.node.querySelector('.bracket-name').textContent = name;
+                    row.lastName = name;
+                }
+            });
+
+            // Drop rows for items that no longer exist
+            rows.forEach((row, itemId) => {
+                if (!seen.has(itemId)) {
+                    row.node.remove();
+                    rows.delete(itemId);
+                }
+            });
+
+            if (fragment.childNodes.length > 0) {
+                container.appendChild(fragment);
+            }
+        }
+        
+        // Keyed reconciliation for the simpler lists: rows are matched by key,
+        // patched in place with updateFn, created with createFn when new, moved
+        // into the new order and removed once their key disappears
+        const keyedListNodes = new WeakMap();
+        
+        function renderKeyedList(container, items, keyFn, createFn, updateFn) {
+            let nodes = keyedListNodes.get(container);
+            if (!nodes) {
+                nodes = new Map();
+                container.replaceChildren();
+            }
+            
+            const nextNodes = new Map();
+            let cursor = container.firstChild;
+            
+            for (let i = 0; i < items.length; i++) {
+                const item = items[i];
+                const key = keyFn(item);
+                let node = nodes.get(key);
+                if (node) {
+                    updateFn(node, item);
+                } else {
+                    node = createFn(item);
+                }
+                nextNodes.set(key, node);
                 
-                if (stationType === 'printing') {
-                    container.innerHTML += `
-                        <div class="bracket-item ${stockClass}">
-                            <div class="bracket-name">${item.description || item.name}</div>
-                            <div class="current-qty">${item.quantity}</div>
-                            <div>
-                                <input type="number" class="qty-input" id="print-qty-${item.id}" value="0" min="0" ${isViewer ? 'disabled' : ''}>
-                            </div>
-                            <div>
-                                ${!isViewer ? `
-                                    <button class="btn-add" onclick="addPrintedBrackets(${item.id})">Add</button>
-                                    <button class="btn-remove" onclick="removePrintedBrackets(${item.id})">Remove</button>
-                                ` : '<span style="color: #6c757d; font-size: 11px;">View Only</span>'}
-                            </div>
-                        </div>
-                    `;
-                } else if (stationType === 'picking') {
-                    container.innerHTML += `
-                        <div class="bracket-item ${stockClass}">
-                            <div class="bracket-name">${item.description || item.name}</div>
-                            <div class="current-qty">${item.quantity}</div>
-                            <div>
-                                <input type="number" class="qty-input" id="pick-qty-${item.id}" value="0" min="0" ${isViewer ? 'disabled' : ''}>
-                            </div>
-                            <div>
-                                ${!isViewer ? `
-                                    <button class="btn-remove" onclick="removeBrackets(${item.id})">Remove</button>
-                                    <button class="btn-add" onclick="addReturn(${item.id})">Return</button>
-                                ` : '<span style="color: #6c757d; font-size: 11px;">View Only</span>'}
-                            </div>
-                        </div>
-                    `;
-                } else if (stationType === 'inventory') {
-                    container.innerHTML += `
-                        <div class="bracket-item ${stockClass}">
-                            <div class="bracket-name">${item.description || item.name}</div>
-                            <div class="current-qty">${item.quantity}</div>
-                            <div>
-                                <input type="number" class="qty-input" id="actual-qty-${item.id}" value="${item.quantity}" min="0" ${isViewer ? 'disabled' : ''}>
-                            </div>
-                            <div>
-                                ${!isViewer ? `
-                                    <button class="btn" onclick="updateActualCount(${item.id})">Update</button>
-                                ` : '<span style="color: #6c757d; font-size: 11px;">View Only</span>'}
-                            </div>
-                        </div>
-                    `;
+                if (node === cursor) {
+                    cursor = cursor.nextSibling;
+                } else {
+                    container.insertBefore(node, cursor);
+                }
+            }
+            
+            nodes.forEach((node, key) => {
+                if (!nextNodes.has(key)) {
+                    node.remove();
+                }
+            });
+            keyedListNodes.set(container, nextNodes);
+        }
+        
+        // Forget the mounted rows, e.g. before replacing the list with an empty-state message
+        function clearKeyedList(container) {
+            keyedListNodes.delete(container);
+            idleRenderTokens.delete(container);
+        }
+        
+        // Run renderOne over items in idle-time slices so long lists don't block input
+        const scheduleIdle = window.requestIdleCallback
+            || (callback => setTimeout(() => callback({ timeRemaining: () => 5 }), 1));
+        
+        function renderChunked(items, renderOne, done) {
+            let i = 0;
+            function step(deadline) {
+                while (i < items.length && deadline.timeRemaining() > 1) {
+                    renderOne(items[i++]);
                 }
+                if (i < items.length) {
+                    scheduleIdle(step);
+                } else if (done) {
+                    done();
+                }
+            }
+            scheduleIdle(step);
+        }
+        
+        // renderKeyedList for lists that may gain hundreds of rows at once: new
+        // rows are built during idle time and mounted together at the end. A newer
+        // render of the same container supersedes one still in progress.
+        const IDLE_RENDER_THRESHOLD = 100;
+        const idleRenderTokens = new WeakMap();
+        
+        function renderKeyedListIdle(container, items, keyFn, createFn, updateFn) {
+            const token = {};
+            idleRenderTokens.set(container, token);
+            
+            const mounted = keyedListNodes.get(container) || new Map();
+            const missing = items.filter(item => !mounted.has(keyFn(item)));
+            if (missing.length <= IDLE_RENDER_THRESHOLD) {
+                renderKeyedList(container, items, keyFn, createFn, updateFn);
+                return;
+            }
+            
+            const prepared = new Map();
+            renderChunked(missing, item => prepared.set(keyFn(item), createFn(item)), () => {
+                if (idleRenderTokens.get(container) !== token) return;
+                renderKeyedList(container, items, keyFn, item => prepared.get(keyFn(item)) || createFn(item), updateFn);
             });
         }
         
+        // Build a Map lookup for a list of records keyed by one of their fields
+        function indexBy(list, key) {
+            const index = new Map();
+            for (let i = 0; i < list.length; i++) {
+                index.set(list[i][key], list[i]);
+            }
+            return index;
+        }
+
+        // Build a row renderer from a tagged template. The static HTML is split
+        // once here; the interpolated labels only document the slot order.
+        function rowTemplate(strings) {
+            return function(...values) {
+                let out = strings[0];
+                for (let i = 0; i < values.length; i++) {
+                    out += values[i] + strings[i + 1];
+                }
+                return out;
+            };
+        }
+        
+        const WORK_ORDER_ITEM_HTML = rowTemplate`<div class="work-order-item"><div class="work-order-header"><div class="work-order-title">${'orderNumber'} - ${'requiredSets'} sets ${'spacer'}</div><div class="work-order-actions">${'moveButton'}${'deleteButton'}</div></div><div class="component-list">${'components'}</div>${'missingWarning'}</div>`;
+        const COMPONENT_ITEM_HTML = rowTemplate`<div class="component-item ${'stateClass'}"><div><strong>${'name'}</strong></div><div>${'available'} / ${'required'}</div><div>${'status'}</div></div>`;
+        const MOVE_BUTTON_HTML = rowTemplate`<button class="btn-move" data-action="moveToAssembly" data-id="${'id'}">Move to Assembly</button>`;
+        const DELETE_BUTTON_HTML = rowTemplate`<button class="btn-delete" data-action="deleteWorkOrder" data-id="${'id'}">Delete</button>`;
+        const MISSING_WARNING_HTML = rowTemplate`<div class="missing-warning"><strong>Missing:</strong> ${'missing'}</div>`;
+        const PRINT_COMPONENT_HTML = rowTemplate`<div class="print-component"><strong>${'name'}</strong><br>Quantity: ${'quantity'}</div>`;
+        
         // Update work order display - manual move to assembly
         function updateWorkOrderDisplay() {
             const container = document.getElementById('work-order-list');
             container.innerHTML = '';
             
+            const invByName = indexBy(currentInventory, 'name');
+            
             // Filter out orders that are already in assembly
-            const activeWorkOrders = workOrders.filter(wo => 
-                !assemblyOrders.some(ao => ao.work_order_id === wo.id)
-            );
+            const assemblyWoIds = new Set();
+            for (let i = 0; i < assemblyOrders.length; i++) {
+                assemblyWoIds.add(assemblyOrders[i].work_order_id);
+            }
+            const activeWorkOrders = workOrders.filter(wo => !assemblyWoIds.has(wo.id));
             
             if (activeWorkOrders.length === 0) {
                 container.innerHTML = '<div class="work-order-item">No work orders ready for assembly</div>';
@@ -1979,72 +2594,57 @@ HTML_TEMPLATE = '''
             });
             
             // Display orders by type in order
-            ['H6', 'H7-282', 'H7-304', 'H9'].forEach(setType => {
+            SET_TYPES_ORDER.forEach(setType => {
                 if (ordersByType[setType].length > 0) {
                     const categoryDiv = document.createElement('div');
                     categoryDiv.className = 'work-order-category';
-                    categoryDiv.innerHTML = `<div class="work-order-category-header">${setType} Sets</div>`;
+                    const orderParts = [`<div class="work-order-category-header">${setType} Sets</div>`];
                     
                     ordersByType[setType].forEach(workOrder => {
                         // Get components for this set type
                         const components = getComponentsForSet(workOrder.set_type, workOrder.include_spacer);
                         let canMoveToAssembly = true;
-                        let missingComponents = [];
+                        const missingComponents = [];
+                        const componentParts = [];
                         
-                        // Check if we have enough of each component
-                        components.forEach(componentName => {
-                            const component = currentInventory.find(item => item.name === componentName);
-                            if (!component || component.quantity < workOrder.required_sets) {
+                        // Check if we have enough of each component and render its status in the same pass
+                        for (let i = 0; i < components.length; i++) {
+                            const componentName = components[i];
+                            const component = invByName.get(componentName);
+                            const available = component ? component.quantity : 0;
+                            const hasEnough = !!component && available >= workOrder.required_sets;
+                            
+                            if (!hasEnough) {
                                 canMoveToAssembly = false;
                                 missingComponents.push({
                                     name: componentName,
                                     required: workOrder.required_sets,
-                                    available: component ? component.quantity : 0,
-                                    missing: workOrder.required_sets - (component ? component.quantity : 0)
+                                    available: available,
+                                    missing: workOrder.required_sets - available
                                 });
                             }
-                        });
+                            
+                            componentParts.push(hasEnough
+                                ? COMPONENT_ITEM_HTML('component-ok', componentName, available, workOrder.required_sets, 'OK')
+                                : COMPONENT_ITEM_HTML('component-missing', componentName, available, workOrder.required_sets, 'LOW'));
+                        }
                         
                         const isViewer = currentUserRole === 'viewer';
                         
-                        categoryDiv.innerHTML += `
-                            <div class="work-order-item">
-                                <div class="work-order-header">
-                                    <div class="work-order-title">${workOrder.order_number} - ${workOrder.required_sets} sets ${workOrder.include_spacer ? '(with spacer)' : ''}</div>
-                                    <div class="work-order-actions">
-                                        ${canMoveToAssembly && !isViewer ? 
-                                            `<button class="btn-move" onclick="moveToAssembly(${workOrder.id})">Move to Assembly</button>` : 
-                                            ''
-                                        }
-                                        ${!isViewer ? 
-                                            `<button class="btn-delete" onclick="deleteWorkOrder(${workOrder.id})">Delete</button>` : 
-                                            ''
-                                        }
-                                    </div>
-                                </div>
-                                <div class="component-list">
-                                    ${components.map(compName => {
-                                        const comp = currentInventory.find(item => item.name === compName);
-                                        const hasEnough = comp && comp.quantity >= workOrder.required_sets;
-                                        const available = comp ? comp.quantity : 0;
-                                        return `
-                                            <div class="component-item ${hasEnough ? 'component-ok' : 'component-missing'}">
-                                                <div><strong>${compName}</strong></div>
-                                                <div>${available} / ${workOrder.required_sets}</div>
-                                                <div>${hasEnough ? 'OK' : 'LOW'}</div>
-                                            </div>
-                                        `;
-                                    }).join('')}
-                                </div>
-                                ${!canMoveToAssembly ? `
-                                    <div class="missing-warning">
-                                        <strong>Missing:</strong> ${missingComponents.map(mc => `${mc.name} (need ${mc.missing})`).join(', ')}
-                                    </div>
-                                ` : ''}
-                            </div>
-                        `;
+                        orderParts.push(WORK_ORDER_ITEM_HTML(
+                            escapeHtml(workOrder.order_number),
+                            workOrder.required_sets,
+                            workOrder.include_spacer ? '(with spacer)' : '',
+                            canMoveToAssembly && !isViewer ? MOVE_BUTTON_HTML(workOrder.id) : '',
+                            !isViewer ? DELETE_BUTTON_HTML(workOrder.id) : '',
+                            componentParts.join(''),
+                            !canMoveToAssembly
+                                ? MISSING_WARNING_HTML(missingComponents.map(mc => `${mc.name} (need ${mc.missing})`).join(', '))
+                                : ''
+                        ));
                     });
                     
+                    categoryDiv.innerHTML = orderParts.join('');
                     container.appendChild(categoryDiv);
                 }
             });
@@ -2066,8 +2666,10 @@ HTML_TEMPLATE = '''
                 return;
             }
             
+            const workOrderById = indexBy(workOrders, 'id');
+
             readyOrders.forEach(order => {
-                const workOrder = workOrders.find(wo => wo.id === order.work_order_id);
+                const workOrder = workOrderById.get(order.work_order_id);
                 if (!workOrder) return;
                 
                 const components = getComponentsForSet(workOrder.set_type, workOrder.include_spacer);
@@ -2077,12 +2679,12 @@ HTML_TEMPLATE = '''
                     <div class="work-order-item assembly-ready">
                         <div class="work-order-header">
                             <div class="work-order-title">
-                                ${workOrder.order_number} - ${workOrder.required_sets} sets ${workOrder.include_spacer ? '(with spacer)' : ''}
+                                ${escapeHtml(workOrder.order_number)} - ${workOrder.required_sets} sets ${workOrder.include_spacer ? '(with spacer)' : ''}
                                 <span class="assembly-status status-ready">READY</span>
                             </div>
                             <div class="work-order-actions">
                                 ${!isViewer ? `
-                                    <button class="btn-complete" onclick="completeAssembly(${order.id})">Complete</button>
+                                    <button class="btn-complete" data-action="completeAssembly" data-id="${order.id}">Complete</button>
                                 ` : ''}
                             </div>
                         </div>
@@ -2098,7 +2700,7 @@ HTML_TEMPLATE = '''
                             }).join('')}
                         </div>
                         <div class="assembly-info">
-                            Moved to assembly: ${new Date(order.moved_at).toLocaleString()}
+                            Moved to assembly: ${formatTimestamp(order.moved_at)}
                         </div>
                     </div>
                 `;
@@ -2115,14 +2717,19 @@ HTML_TEMPLATE = '''
             }
             
             const printContainer = document.getElementById('printable-picking-list');
-            printContainer.innerHTML = '';
             
             // Create a container for all printable orders
             const allOrdersContainer = document.createElement('div');
             allOrdersContainer.className = 'print-all-container';
             
+            const workOrderById = indexBy(workOrders, 'id');
+            const fragment = document.createDocumentFragment();
+            const now = new Date();
+            const printDate = D_FMT.format(now);
+            const generatedAt = DT_FMT.format(now);
+
             readyOrders.forEach((order, index) => {
-                const workOrder = workOrders.find(wo => wo.id === order.work_order_id);
+                const workOrder = workOrderById.get(order.work_order_id);
                 if (!workOrder) return;
                 
                 const components = getComponentsForSet(workOrder.set_type, workOrder.include_spacer);
@@ -2132,45 +2739,41 @@ HTML_TEMPLATE = '''
                 printableDiv.innerHTML = `
                     <div class="print-header">
                         <h2>PICKING LIST</h2>
-                        <h3>Work Order: ${workOrder.order_number}</h3>
+                        <h3>Work Order: ${escapeHtml(workOrder.order_number)}</h3>
                         <p>Set Type: ${workOrder.set_type} | Required Sets: ${workOrder.required_sets}</p>
-                        <p>Date: ${new Date().toLocaleDateString()}</p>
+                        <p>Date: ${printDate}</p>
                     </div>
                     <div class="print-components">
-                        ${components.map(compName => `
-                            <div class="print-component">
-                                <strong>${compName}</strong><br>
-                                Quantity: ${workOrder.required_sets}
-                            </div>
-                        `).join('')}
+                        ${components.map(compName => PRINT_COMPONENT_HTML(compName, workOrder.required_sets)).join('')}
                     </div>
                     <div class="print-footer">
-                        <p>Generated: ${new Date().toLocaleString()}</p>
+                        <p>Generated: ${generatedAt}</p>
                         <p>Bracket Inventory Tracker</p>
                     </div>
                 `;
                 
-                allOrdersContainer.appendChild(printableDiv);
+                fragment.appendChild(printableDiv);
                 
                 // Add page break except for the last order
                 if (index < readyOrders.length - 1) {
-                    allOrdersContainer.innerHTML += '<div style="page-break-after: always;"></div>';
+                    const pageBreak = document.createElement('div');
+                    pageBreak.style.pageBreakAfter = 'always';
+                    fragment.appendChild(pageBreak);
                 }
             });
             
-            printContainer.appendChild(allOrdersContainer);
+            allOrdersContainer.appendChild(fragment);
+            printContainer.replaceChildren(allOrdersContainer);
             
             // Show print dialog
             printContainer.style.display = 'block';
             
-            // Use a small delay to ensure the content is rendered before printing
-            setTimeout(() => {
+            // Wait two frames so the content has been laid out before printing
+            requestAnimationFrame(() => requestAnimationFrame(() => {
                 window.print();
                 // Hide after printing
-                setTimeout(() => {
-                    printContainer.style.display = 'none';
-                }, 100);
-            }, 100);
+                printContainer.style.display = 'none';
+            }));
         }
         
         // Update set analysis display
@@ -2178,25 +2781,28 @@ HTML_TEMPLATE = '''
             const container = document.getElementById('set-analysis-list');
             container.innerHTML = '';
             
-            const setTypes = ['H6', 'H7-282', 'H7-304', 'H9'];
+            const invByName = indexBy(currentInventory, 'name');
             
-            setTypes.forEach(setType => {
+            SET_TYPES_ORDER.forEach(setType => {
                 const components = getComponentsForSet(setType, false); // Base analysis without spacer
-                const componentQtys = components.map(compName => {
-                    const comp = currentInventory.find(item => item.name === compName);
-                    return comp ? comp.quantity : 0;
-                });
                 
-                // The maximum number of complete sets we can build
-                const maxSets = Math.min(...componentQtys);
+                // Look up each component once and track the maximum number of complete sets we can build
+                const qtys = new Array(components.length);
+                let maxSets = Infinity;
+                for (let i = 0; i < components.length; i++) {
+                    const comp = invByName.get(components[i]);
+                    const qty = comp ? comp.quantity : 0;
+                    qtys[i] = qty;
+                    if (qty < maxSets) maxSets = qty;
+                }
+                if (maxSets === Infinity) maxSets = 0;
                 
                 container.innerHTML += `
                     <div class="set-item">
                         <div class="set-header">${setType} Set Analysis</div>
                         <div class="component-list">
                             ${components.map((compName, index) => {
-                                const comp = currentInventory.find(item => item.name === compName);
-                                const qty = comp ? comp.quantity : 0;
+                                const qty = qtys[index];
                                 const setsPossible = Math.floor(qty);
                                 const isLimiting = setsPossible === maxSets;
                                 return `
@@ -2216,27 +2822,48 @@ HTML_TEMPLATE = '''
             });
         }
         
+        // Components for each set type. The arrays are shared between callers,
+        // so they are frozen.
+        const H6_COMPONENTS = Object.freeze(['H6-623A', 'H6-623B', 'H6-623C']);
+        const H7_282_COMPONENTS = Object.freeze(['H7-282']);
+        const H7_304_COMPONENTS = Object.freeze(['H7-304']);
+        const H9_COMPONENTS = Object.freeze(['H9-923A', 'H9-923B', 'H9-923C']);
+        const H9_SPACER_COMPONENTS = Object.freeze(['H9-923A', 'H9-923B', 'H9-923C', 'H9-SPACER']);
+        const EMPTY_COMPONENTS = Object.freeze([]);
+
         // Get components for each set type
         function getComponentsForSet(setType, includeSpacer = false) {
-            const componentMap = {
-                'H6': ['H6-623A', 'H6-623B', 'H6-623C'],
-                'H7-282': ['H7-282'],
-                'H7-304': ['H7-304'],
-                'H9': includeSpacer ? ['H9-923A', 'H9-923B', 'H9-923C', 'H9-SPACER'] : ['H9-923A', 'H9-923B', 'H9-923C']
-            };
-            return componentMap[setType] || [];
+            switch (setType) {
+                case 'H6': return H6_COMPONENTS;
+                case 'H7-282': return H7_282_COMPONENTS;
+                case 'H7-304': return H7_304_COMPONENTS;
+                case 'H9': return includeSpacer ? H9_SPACER_COMPONENTS : H9_COMPONENTS;
+                default: return EMPTY_COMPONENTS;
+            }
+        }
+        
+        // Apply a quantity change locally before the server confirms it. The
+        // server's inventory_item:update delta carries the committed quantity, so
+        // any drift is reconciled there.
+        function applyInventoryChange(itemId, change) {
+            const item = currentInventory.find(i => i.id === itemId);
+            if (item && item.quantity + change >= 0) {
+                item.quantity += change;
+                invalidateTabs();
+            }
         }
         
         // Printing Station Functions
         function addPrintedBrackets(itemId) {
             const qtyInput = document.getElementById(`print-qty-${itemId}`);
-            const quantity = parseInt(qtyInput.value);
+            const quantity = qtyInput.valueAsNumber | 0;
             
-            if (!quantity || quantity < 1) {
+            if (quantity < 1) {
                 alert('Please enter a valid quantity greater than 0');
                 return;
             }
             
+            applyInventoryChange(itemId, quantity);
             socket.emit('inventory_change', {
                 item_id: itemId,
                 change: quantity,
@@ -2250,13 +2877,14 @@ HTML_TEMPLATE = '''
         
         function removePrintedBrackets(itemId) {
             const qtyInput = document.getElementById(`print-qty-${itemId}`);
-            const quantity = parseInt(qtyInput.value);
+            const quantity = qtyInput.valueAsNumber | 0;
             
-            if (!quantity || quantity < 1) {
+            if (quantity < 1) {
                 alert('Please enter a valid quantity greater than 0');
                 return;
             }
             
+            applyInventoryChange(itemId, -quantity);
             socket.emit('inventory_change', {
                 item_id: itemId,
                 change: -quantity,
@@ -2271,13 +2899,14 @@ HTML_TEMPLATE = '''
         // Picking Station Functions
         function removeBrackets(itemId) {
             const qtyInput = document.getElementById(`pick-qty-${itemId}`);
-            const quantity = parseInt(qtyInput.value);
+            const quantity = qtyInput.valueAsNumber | 0;
             
-            if (!quantity || quantity < 1) {
+            if (quantity < 1) {
                 alert('Please enter a valid quantity greater than 0');
                 return;
             }
             
+            applyInventoryChange(itemId, -quantity);
             socket.emit('inventory_change', {
                 item_id: itemId,
                 change: -quantity,
@@ -2291,13 +2920,14 @@ HTML_TEMPLATE = '''
         
         function addReturn(itemId) {
             const qtyInput = document.getElementById(`pick-qty-${itemId}`);
-            const quantity = parseInt(qtyInput.value);
+            const quantity = qtyInput.valueAsNumber | 0;
             
-            if (!quantity || quantity < 1) {
+            if (quantity < 1) {
                 alert('Please enter a valid quantity greater than 0');
                 return;
             }
             
+            applyInventoryChange(itemId, quantity);
             socket.emit('inventory_change', {
                 item_id: itemId,
                 change: quantity,
@@ -2313,34 +2943,32 @@ HTML_TEMPLATE = '''
         function addWorkOrder() {
             const orderNumber = document.getElementById('workOrderNumber').value;
             const setType = document.getElementById('workOrderSetType').value;
-            const quantity = parseInt(document.getElementById('workOrderQty').value);
+            const quantity = document.getElementById('workOrderQty').valueAsNumber | 0;
             const includeSpacer = setType === 'H9' ? document.getElementById('includeSpacer').checked : false;
             
-            if (!orderNumber || !quantity || quantity < 1) {
+            if (!orderNumber || quantity < 1) {
                 alert('Please enter Work Order # and valid quantity greater than 0');
                 return;
             }
             
-            fetch('/api/add_work_order', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({
-                    order_number: orderNumber,
-                    set_type: setType,
-                    required_sets: quantity,
-                    include_spacer: includeSpacer
-                })
+            postJson('/api/add_work_order', {
+                order_number: orderNumber,
+                set_type: setType,
+                required_sets: quantity,
+                include_spacer: includeSpacer
             })
-            .then(response => response.json())
             .then(data => {
                 if (data.success) {
-                    alert('Work order added successfully!');
                     document.getElementById('workOrderNumber').value = '';
                     document.getElementById('workOrderQty').value = '0';
                     document.getElementById('includeSpacer').checked = false;
                     
-                    // Refresh data
-                    socket.emit('get_inventory');
+                    if (!data.items && data.work_order) {
+                        workOrders.push(data.work_order);
+                        invalidateTabs();
+                    } else {
+                        refreshFromResponse(data);
+                    }
                 } else {
                     alert('Error: ' + data.error);
                 }
@@ -2352,18 +2980,13 @@ HTML_TEMPLATE = '''
                 return;
             }
             
-            fetch('/api/move_to_assembly', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({
-                    work_order_id: workOrderId
-                })
+            postJson('/api/move_to_assembly', {
+                work_order_id: workOrderId
             })
-            .then(response => response.json())
             .then(data => {
                 if (data.success) {
-                    alert('Work order moved to Assembly Line! Components deducted from inventory.');
-                    socket.emit('get_inventory');
+                    // Component deductions happen on the server; pull the new counts
+                    refreshFromResponse(data);
                 } else {
                     alert('Error: ' + data.error);
                 }
@@ -2375,19 +2998,17 @@ HTML_TEMPLATE = '''
                 return;
             }
             
-            fetch('/api/delete_work_order', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({
-                    work_order_id: workOrderId
-                })
+            const previousWorkOrders = workOrders;
+            workOrders = workOrders.filter(wo => wo.id !== workOrderId);
+            invalidateTabs();
+            
+            postJson('/api/delete_work_order', {
+                work_order_id: workOrderId
             })
-            .then(response => response.json())
             .then(data => {
-                if (data.success) {
-                    alert('Work order deleted successfully!');
-                    socket.emit('get_inventory');
-                } else {
+                if (!data.success) {
+                    workOrders = previousWorkOrders;
+                    invalidateTabs();
                     alert('Error: ' + data.error);
                 }
             });
@@ -2399,7 +3020,7 @@ HTML_TEMPLATE = '''
                 .then(response => response.json())
                 .then(data => {
                     assemblyOrders = data.assembly_orders || [];
-                    updateAssemblyDisplay();
+                    invalidateTabs();
                 });
         }
         
@@ -2408,19 +3029,17 @@ HTML_TEMPLATE = '''
                 return;
             }
             
-            fetch('/api/complete_assembly', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({
-                    assembly_order_id: assemblyOrderId
-                })
+            const previousAssemblyOrders = assemblyOrders;
+            assemblyOrders = assemblyOrders.filter(ao => ao.id !== assemblyOrderId);
+            invalidateTabs();
+            
+            postJson('/api/complete_assembly', {
+                assembly_order_id: assemblyOrderId
             })
-            .then(response => response.json())
             .then(data => {
-                if (data.success) {
-                    alert('Assembly completed successfully!');
-                    socket.emit('get_inventory');
-                } else {
+                if (!data.success) {
+                    assemblyOrders = previousAssemblyOrders;
+                    invalidateTabs();
                     alert('Error: ' + data.error);
                 }
             });
@@ -2429,9 +3048,9 @@ HTML_TEMPLATE = '''
         // Inventory Management Functions
         function updateActualCount(itemId) {
             const actualInput = document.getElementById(`actual-qty-${itemId}`);
-            const actualQty = parseInt(actualInput.value);
+            const actualQty = Math.trunc(actualInput.valueAsNumber);
             
-            if (isNaN(actualQty) || actualQty < 0) {
+            if (!Number.isFinite(actualQty) || actualQty < 0) {
                 alert('Please enter a valid quantity');
                 return;
             }
@@ -2448,6 +3067,7 @@ HTML_TEMPLATE = '''
             
             const notes = `Physical count adjustment: ${currentItem.quantity} → ${actualQty}`;
             
+            applyInventoryChange(itemId, adjustment);
             socket.emit('inventory_change', {
                 item_id: itemId,
                 change: adjustment,
@@ -2470,10 +3090,7 @@ HTML_TEMPLATE = '''
         }
         
         function generateWorkOrderAnalysis() {
-            fetch('/api/work_order_analysis', {
-                method: 'POST'
-            })
-            .then(response => response.json())
+            postJson('/api/work_order_analysis')
             .then(data => {
                 if (data.success) {
                     alert('Work order analysis sent to Slack!');
@@ -2496,17 +3113,38 @@ HTML_TEMPLATE = '''
             const formData = new FormData();
             formData.append('csv_file', file);
             
-            fetch('/api/upload_csv', {
-                method: 'POST',
-                body: formData
+            // XHR rather than fetch so the upload itself can report progress
+            const progress = document.getElementById('csvUploadProgress');
+            progress.value = 0;
+            progress.style.display = 'block';
+            
+            new Promise((resolve, reject) => {
+                const xhr = new XMLHttpRequest();
+                xhr.upload.onprogress = (e) => {
+                    if (e.lengthComputable) {
+                        progress.value = e.loaded / e.total;
+                    }
+                };
+                xhr.onload = () => {
+                    try {
+                        resolve(JSON.parse(xhr.responseText));
+                    } catch (err) {
+                        reject(`${xhr.status} ${xhr.statusText}`);
+                    }
+                };
+                xhr.onerror = () => reject('network error');
+                xhr.open('POST', '/api/upload_csv');
+                xhr.send(formData);
+            })
+            .finally(() => {
+                progress.style.display = 'none';
             })
-            .then(response => response.json())
             .then(data => {
                 if (data.success) {
                     alert('CSV uploaded successfully! ' + data.message);
                     document.getElementById('csvFile').value = '';
-                    loadExternalOrders();
-                    socket.emit('get_inventory');
+                    scheduleReload(loadExternalOrders);
+                    refreshFromResponse(data);
                 } else {
                     alert('Error: ' + data.error);
                 }
@@ -2517,103 +3155,100 @@ HTML_TEMPLATE = '''
         }
         
         function loadExternalOrders() {
-            fetch('/api/external_orders')
-                .then(response => response.json())
-                .then(data => {
-                    updateExternalOrdersDisplay(data.orders);
+            cachedFetch('/api/external_orders')
+                .then(({ data, changed }) => {
+                    if (!changed) return;
+                    externalOrders = data.orders;
+                    updateExternalOrdersDisplay(externalOrders);
                 });
         }
         
         function updateExternalOrdersDisplay(orders) {
             const container = document.getElementById('external-orders-list');
-            container.innerHTML = '';
             
             if (orders.length === 0) {
+                clearKeyedList(container);
                 container.innerHTML = '<div class="external-order-item">No external work orders found</div>';
                 return;
             }
             
-            orders.forEach(order => {
-                const requiredBrackets = Array.isArray(order.required_brackets) ? order.required_brackets : JSON.parse(order.required_brackets || '[]');
-                const isViewer = currentUserRole === 'viewer';
-                
-                container.innerHTML += `
-                    <div class="external-order-item">
-                        <div class="work-order-header">
-                            <div class="work-order-title">${order.external_order_number}</div>
-                            <div class="work-order-actions">
-                                ${!isViewer ? `
-                                    <button class="btn-convert" onclick="convertExternalOrder(${order.id})">Convert to Work Order</button>
-                                    <button class="btn-complete" onclick="completeExternalOrder(${order.id})">Complete</button>
-                                    <button class="btn-delete" onclick="deleteExternalOrder(${order.id})">Delete</button>
-                                ` : ''}
-                            </div>
-                        </div>
-                        <div class="external-order-info">
-                            <div class="external-order-detail">
-                                <strong>SKU</strong>
-                                ${order.sku}
-                            </div>
-                            <div class="external-order-detail">
-                                <strong>Quantity</strong>
-                                ${order.quantity} sets
-                            </div>
-                            <div class="external-order-detail">
-                                <strong>GPU Brackets</strong>
-                                ${requiredBrackets.join(', ')}
-                            </div>
-                        </div>
-                        <div style="margin-top: 6px; font-size: 12px;">
-                            <strong>Status:</strong> ${order.status} | 
-                            <strong>Created:</strong> ${new Date(order.created_at).toLocaleString()}
-                        </div>
-                    </div>
-                `;
-            });
+            renderKeyedListIdle(container, orders, order => order.id, createExternalOrderRow, fillExternalOrderRow);
         }
         
-        function convertExternalOrder(orderId) {
-            if (!confirm('Convert this external order to a regular work order?')) {
-                return;
+        function createExternalOrderRow(order) {
+            const template = document.getElementById('tpl-external-order-row');
+            const orderDiv = template.content.firstElementChild.cloneNode(true);
+            
+            orderDiv.querySelector('[data-field="external_order_number"]').textContent = order.external_order_number;
+            orderDiv.querySelector('[data-field="created_at"]').textContent = formatTimestamp(order.created_at);
+            
+            const actions = orderDiv.querySelector('.work-order-actions');
+            if (currentUserRole === 'viewer') {
+                actions.replaceChildren();
+            } else {
+                actions.querySelectorAll('button[data-action]').forEach(button => {
+                    button.dataset.id = order.id;
+                });
             }
             
-            fetch('/api/convert_external_order', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ external_order_id: orderId })
-            })
-            .then(response => response.json())
+            fillExternalOrderRow(orderDiv, order);
+            return orderDiv;
+        }
+        
+        // Patch the fields that can change after creation; text only, no HTML parsing
+        function fillExternalOrderRow(orderDiv, order) {
+            const signature = `${order.status}|${order.quantity}|${order.sku}|${order.required_brackets}`;
+            if (orderDiv._signature === signature) return;
+            orderDiv._signature = signature;
+            
+            const requiredBrackets = Array.isArray(order.required_brackets) ? order.required_brackets : JSON.parse(order.required_brackets || '[]');
+            
+            orderDiv.querySelector('[data-field="sku"]').textContent = order.sku;
+            orderDiv.querySelector('[data-field="quantity"]').textContent = order.quantity;
+            orderDiv.querySelector('[data-field="required_brackets"]').textContent = requiredBrackets.join(', ');
+            orderDiv.querySelector('[data-field="status"]').textContent = order.status;
+        }
+        
+        // Apply an external order change locally before the server confirms it.
+        // mutate returns the updated order, or null to drop it from the list.
+        // A list reload after success reconciles the final state; on failure
+        // the previous list is restored.
+        function updateExternalOrderOptimistically(orderId, url, body, mutate) {
+            const previousOrders = externalOrders;
+            externalOrders = externalOrders
+                .map(o => o.id === orderId ? mutate(o) : o)
+                .filter(o => o !== null);
+            updateExternalOrdersDisplay(externalOrders);
+            
+            postJson(url, body)
             .then(data => {
                 if (data.success) {
-                    alert('External order converted to work order successfully!');
-                    loadExternalOrders();
-                    socket.emit('get_inventory');
+                    scheduleReload(loadExternalOrders);
+                    refreshFromResponse(data);
                 } else {
-                    alert('Error: ' + data.error);
+                    externalOrders = previousOrders;
+                    updateExternalOrdersDisplay(externalOrders);
+                    showSystemAlert('Error: ' + data.error, 'error');
                 }
             });
         }
         
+        function convertExternalOrder(orderId) {
+            if (!confirm('Convert this external order to a regular work order?')) {
+                return;
+            }
+            
+            updateExternalOrderOptimistically(orderId, '/api/convert_external_order', { external_order_id: orderId },
+                order => ({ ...order, status: 'converted' }));
+        }
+        
         function completeExternalOrder(orderId) {
             if (!confirm('Mark this external work order as complete?')) {
                 return;
             }
             
-            fetch('/api/complete_external_order', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ order_id: orderId })
-            })
-            .then(response => response.json())
-            .then(data => {
-                if (data.success) {
-                    alert('External work order completed successfully!');
-                    loadExternalOrders();
-                    socket.emit('get_inventory');
-                } else {
-                    alert('Error: ' + data.error);
-                }
-            });
+            updateExternalOrderOptimistically(orderId, '/api/complete_external_order', { order_id: orderId },
+                order => ({ ...order, status: 'completed' }));
         }
         
         function deleteExternalOrder(orderId) {
@@ -2621,21 +3256,8 @@ HTML_TEMPLATE = '''
                 return;
             }
             
-            fetch('/api/delete_external_order', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ order_id: orderId })
-            })
-            .then(response => response.json())
-            .then(data => {
-                if (data.success) {
-                    alert('External work order deleted successfully!');
-                    loadExternalOrders();
-                    socket.emit('get_inventory');
-                } else {
-                    alert('Error: ' + data.error);
-                }
-            });
+            updateExternalOrderOptimistically(orderId, '/api/delete_external_order', { order_id: orderId },
+                () => null);
         }
         
         // History functions
@@ -2643,10 +3265,9 @@ HTML_TEMPLATE = '''
             const limit = document.getElementById('historyLimit').value;
             const filter = document.getElementById('historyFilter').value;
             
-            fetch(`/api/history?limit=${limit}&filter=${filter}`)
-                .then(response => response.json())
-                .then(data => {
-                    updateHistoryDisplay(data.history);
+            cachedFetch(`/api/history?limit=${limit}&filter=${filter}`)
+                .then(({ data, changed }) => {
+                    if (changed) updateHistoryDisplay(data.history);
                 });
         }
         
@@ -2656,65 +3277,76 @@ HTML_TEMPLATE = '''
         
         function updateHistoryDisplay(history) {
             const container = document.getElementById('historyList');
-            container.innerHTML = '';
             
             if (history.length === 0) {
+                clearKeyedList(container);
                 container.innerHTML = '<div class="history-item">No history found</div>';
                 return;
             }
             
-            history.forEach(record => {
-                const typeClass = record.change > 0 ? 'history-add' : 'history-remove';
-                const sign = record.change > 0 ? '+' : '';
-                const time = new Date(record.timestamp).toLocaleString();
-                
-                container.innerHTML += `
-                    <div class="history-item ${typeClass}">
-                        <div>
-                            <strong>${record.station}</strong><br>
-                            ${record.item_name}: ${sign}${record.change}<br>
-                            <small>By: ${record.username || 'System'} | ${time}</small>
-                        </div>
-                        <div style="text-align: right;">
-                            ${record.notes ? `<small>${record.notes}</small>` : ''}
-                        </div>
+            // Transactions never change once written, so existing rows are kept as-is
+            renderKeyedListIdle(container, history, record => record.id, createHistoryRow, () => {});
+        }
+        
+        function createHistoryRow(record) {
+            const typeClass = record.change > 0 ? 'history-add' : 'history-remove';
+            const sign = record.change > 0 ? '+' : '';
+            const time = formatTimestamp(record.timestamp);
+            
+            const recordDiv = document.createElement('div');
+            recordDiv.className = `history-item ${typeClass}`;
+            recordDiv.innerHTML = `
+                    <div>
+                        <strong>${escapeHtml(record.station)}</strong><br>
+                        ${escapeHtml(record.item_name)}: ${sign}${record.change}<br>
+                        <small>By: ${escapeHtml(record.username || 'System')} | ${time}</small>
                     </div>
-                `;
-            });
+                    <div style="text-align: right;">
+                        ${record.notes ? `<small>${escapeHtml(record.notes)}</small>` : ''}
+                    </div>
+            `;
+            return recordDiv;
         }
         
         // Admin Functions
         function loadUsers() {
             if (currentUserRole !== 'admin') return;
             
-            fetch('/api/users')
-                .then(response => response.json())
-                .then(data => {
-                    updateUserList(data.users);
+            cachedFetch('/api/users')
+                .then(({ data, changed }) => {
+                    if (changed) updateUserList(data.users);
                 });
         }
         
         function updateUserList(users) {
             const container = document.getElementById('userList');
-            container.innerHTML = '';
+            renderKeyedList(container, users, user => user.id, createUserRow, fillUserRow);
+        }
+        
+        function createUserRow(user) {
+            const userDiv = document.createElement('div');
+            userDiv.className = 'user-item';
+            fillUserRow(userDiv, user);
+            return userDiv;
+        }
+        
+        function fillUserRow(userDiv, user) {
+            if (userDiv._role === user.role) return;
+            userDiv._role = user.role;
             
-            users.forEach(user => {
-                container.innerHTML += `
-                    <div class="user-item">
-                        <div>
-                            <strong>${user.username}</strong> - ${user.role}
-                            ${user.username === '{{ session.username }}' ? ' <em>(current user)</em>' : ''}
-                        </div>
-                        <div class="user-actions">
-                            <button class="btn" onclick="changeUserRole(${user.id})">Change Role</button>
-                            ${user.username !== '{{ session.username }}' ? 
-                                `<button class="btn-remove" onclick="deleteUser(${user.id})">Delete</button>` : 
-                                ''
-                            }
-                        </div>
+            userDiv.innerHTML = `
+                    <div>
+                        <strong>${escapeHtml(user.username)}</strong> - ${user.role}
+                        ${user.username === SESSION.username ? ' <em>(current user)</em>' : ''}
                     </div>
-                `;
-            });
+                    <div class="user-actions">
+                        <button class="btn" data-action="changeUserRole" data-id="${user.id}">Change Role</button>
+                        ${user.username !== SESSION.username ? 
+                            `<button class="btn-remove" data-action="deleteUser" data-id="${user.id}">Delete</button>` : 
+                            ''
+                        }
+                    </div>
+            `;
         }
         
         function addUser() {
@@ -2727,18 +3359,13 @@ HTML_TEMPLATE = '''
                 return;
             }
             
-            fetch('/api/users', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ username, password, role })
-            })
-            .then(response => response.json())
+            postJson('/api/users', { username, password, role })
             .then(data => {
                 if (data.success) {
                     alert('User added successfully!');
                     document.getElementById('newUsername').value = '';
                     document.getElementById('newPassword').value = '';
-                    loadUsers();
+                    scheduleReload(loadUsers);
                 } else {
                     alert('Error: ' + data.error);
                 }
@@ -2752,16 +3379,11 @@ HTML_TEMPLATE = '''
                 return;
             }
             
-            fetch('/api/users/role', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ user_id: userId, role: newRole })
-            })
-            .then(response => response.json())
+            postJson('/api/users/role', { user_id: userId, role: newRole })
             .then(data => {
                 if (data.success) {
                     alert('User role updated successfully!');
-                    loadUsers();
+                    scheduleReload(loadUsers);
                 } else {
                     alert('Error: ' + data.error);
                 }
@@ -2773,16 +3395,11 @@ HTML_TEMPLATE = '''
                 return;
             }
             
-            fetch('/api/users', {
-                method: 'DELETE',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ user_id: userId })
-            })
-            .then(response => response.json())
+            postJson('/api/users', { user_id: userId }, 'DELETE')
             .then(data => {
                 if (data.success) {
                     alert('User deleted successfully!');
-                    loadUsers();
+                    scheduleReload(loadUsers);
                 } else {
                     alert('Error: ' + data.error);
                 }
@@ -2793,19 +3410,14 @@ HTML_TEMPLATE = '''
             const lowStock = document.getElementById('lowStockThreshold').value;
             const criticalStock = document.getElementById('criticalStockThreshold').value;
             
-            fetch('/api/stock_settings', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ 
-                    low_stock: parseInt(lowStock),
-                    critical_stock: parseInt(criticalStock)
-                })
+            postJson('/api/stock_settings', {
+                low_stock: parseInt(lowStock),
+                critical_stock: parseInt(criticalStock)
             })
-            .then(response => response.json())
             .then(data => {
                 if (data.success) {
                     alert('Stock settings updated successfully!');
-                    socket.emit('get_inventory');
+                    refreshFromResponse(data);
                 } else {
                     alert('Error: ' + data.error);
                 }
@@ -2815,10 +3427,10 @@ HTML_TEMPLATE = '''
         function loadCompanySettings() {
             if (currentUserRole !== 'admin') return;
             
-            fetch('/api/company_settings')
-                .then(response => response.json())
-                .then(data => {
-                    if (data.success) {
+            cachedFetch('/api/company_settings')
+                .then(({ data, changed }) => {
+                    if (changed && data.success) {
+                        savedSkuMappings = skuMappingsKey(data.sku_mapping || {}, data.sku_set_mapping || {});
                         document.getElementById('skuMapping').value = JSON.stringify(data.sku_mapping || {}, null, 2);
                         document.getElementById('skuSetMapping').value = JSON.stringify(data.sku_set_mapping || {}, null, 2);
                         document.getElementById('lowStockThreshold').value = data.low_stock_threshold || 5;
@@ -2828,6 +3440,14 @@ HTML_TEMPLATE = '''
                 });
         }
         
+        // Compact form of the mappings last loaded from or saved to the server,
+        // used to skip saves that wouldn't change anything
+        let savedSkuMappings = null;
+        
+        function skuMappingsKey(skuMapping, skuSetMapping) {
+            return JSON.stringify([skuMapping, skuSetMapping]);
+        }
+        
         function saveSkuMapping() {
             const skuMappingText = document.getElementById('skuMapping').value;
             const skuSetMappingText = document.getElementById('skuSetMapping').value;
@@ -2835,21 +3455,23 @@ HTML_TEMPLATE = '''
             try {
                 const skuMapping = JSON.parse(skuMappingText);
                 const skuSetMapping = JSON.parse(skuSetMappingText);
+                const mappingsKey = skuMappingsKey(skuMapping, skuSetMapping);
                 
-                fetch('/api/sku_mapping', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ 
-                        sku_mapping: skuMapping,
-                        sku_set_mapping: skuSetMapping
-                    })
+                if (mappingsKey === savedSkuMappings) {
+                    showSystemAlert('No changes to SKU mapping', 'info');
+                    return;
+                }
+                
+                postJson('/api/sku_mapping', {
+                    sku_mapping: skuMapping,
+                    sku_set_mapping: skuSetMapping
                 })
-                .then(response => response.json())
                 .then(data => {
                     if (data.success) {
+                        savedSkuMappings = mappingsKey;
                         alert('SKU mapping saved successfully!');
-                        socket.emit('get_inventory');
-                        loadExternalOrders();
+                        refreshFromResponse(data);
+                        scheduleReload(loadExternalOrders);
                         } else {
                         alert('Error: ' + data.error);
                     }
@@ -2862,12 +3484,7 @@ HTML_TEMPLATE = '''
         function updateSlackWebhook() {
             const webhook = document.getElementById('slackWebhook').value;
             
-            fetch('/api/slack_webhook', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ webhook_url: webhook })
-            })
-            .then(response => response.json())
+            postJson('/api/slack_webhook', { webhook_url: webhook })
             .then(data => {
                 if (data.success) {
                     alert('Slack webhook updated successfully!');
@@ -2878,10 +3495,7 @@ HTML_TEMPLATE = '''
         }
         
         function testSlackNotification() {
-            fetch('/api/test_slack', {
-                method: 'POST'
-            })
-            .then(response => response.json())
+            postJson('/api/test_slack')
             .then(data => {
                 if (data.success) {
                     alert('Test notification sent!');
@@ -2896,22 +3510,103 @@ HTML_TEMPLATE = '''
                 return;
             }
             
-            fetch('/api/clear_chat_history', {
-                method: 'POST'
-            })
-            .then(response => response.json())
+            postJson('/api/clear_chat_history')
             .then(data => {
                 if (data.success) {
                     alert('Chat history cleared successfully!');
-                    loadChatMessages();
+                    scheduleReload(loadChatMessages);
                 } else {
                     alert('Error: ' + data.error);
                 }
             });
         }
         
+        // GET with If-None-Match against the last ETag seen for the URL. Resolves
+        // with the parsed body and whether it differs from what was rendered last.
+        const responseCache = new Map();
+        
+        async function cachedFetch(url) {
+            const cached = responseCache.get(url);
+            const response = await fetch(url, cached ? { headers: { 'If-None-Match': cached.etag } } : undefined);
+            if (response.status === 304 && cached) {
+                return { data: cached.data, changed: false };
+            }
+            const data = await response.json();
+            const etag = response.headers.get('ETag');
+            if (etag) {
+                responseCache.set(url, { etag, data });
+            }
+            return { data, changed: true };
+        }
+        
+        const JSON_HEADERS = Object.freeze({ 'Content-Type': 'application/json' });
+        
+        // POST (or DELETE) a JSON body and resolve with the parsed reply. Error
+        // pages that aren't JSON and empty 204 replies are mapped to the usual
+        // { success, error } shape so callers keep a single code path.
+        async function postJson(url, body, method = 'POST') {
+            const options = body === undefined
+                ? { method }
+                : { method, headers: JSON_HEADERS, body: JSON.stringify(body) };
+            const response = await fetch(url, options);
+            if (response.status === 204) {
+                return { success: true };
+            }
+            const contentType = response.headers.get('Content-Type') || '';
+            if (!response.ok && !contentType.includes('application/json')) {
+                return { success: false, error: `${response.status} ${response.statusText}` };
+            }
+            return response.json();
+        }
+        
+        // Row buttons carry data-action/data-id and are handled by one listener per list container
+        const ROW_ACTIONS = {
+            addPrinted: addPrintedBrackets,
+            removePrinted: removePrintedBrackets,
+            removePicked: removeBrackets,
+            returnPicked: addReturn,
+            updateCount: updateActualCount,
+            moveToAssembly: moveToAssembly,
+            deleteWorkOrder: deleteWorkOrder,
+            completeAssembly: completeAssembly,
+            convertExternalOrder: convertExternalOrder,
+            completeExternalOrder: completeExternalOrder,
+            deleteExternalOrder: deleteExternalOrder,
+            changeUserRole: changeUserRole,
+            deleteUser: deleteUser
+        };
+        
+        const ROW_ACTION_CONTAINERS = [
+            'h6-printing-list', 'h7-printing-list', 'h9-printing-list',
+            'h6-picking-list', 'h7-picking-list', 'h9-picking-list',
+            'h6-inventory-list', 'h7-inventory-list', 'h9-inventory-list',
+            'work-order-list', 'assembly-ready-list',
+            'external-orders-list', 'userList'
+        ];
+        
+        function handleRowAction(event) {
+            const button = event.target.closest('button[data-action]');
+            if (!button) return;
+            
+            const action = ROW_ACTIONS[button.dataset.action];
+            if (action) {
+                action(Number(button.dataset.id));
+            }
+        }
+        
+        function bindRowActions() {
+            ROW_ACTION_CONTAINERS.forEach(containerId => {
+                const container = document.getElementById(containerId);
+                if (container) {
+                    container.addEventListener('click', handleRowAction);
+                }
+            });
+        }
+        
         // Load history when page loads
         window.onload = function() {
+            bindRowActions();
+            
             if (currentUserRole !== 'viewer') {
                 loadHistory();
                 loadExternalOrders();
@@ -2968,26 +3663,94 @@ HTML_TEMPLATE = '''
                 document.onmousemove = null;
             }
         }
-    </script>
-</body>
-</html>
 '''
 
+APP_SCRIPT_VERSION = hashlib.sha256(APP_SCRIPT.encode()).hexdigest()[:12]
+
+# scrypt cost parameters (~16 MB, tens of milliseconds per hash)
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+
+# Each scrypt call takes ~16 MiB and tens of milliseconds of CPU. Login
+# hashing runs on this small dedicated pool so a burst of sign-ins queues up
+# instead of starving the socket and request threads.
+PASSWORD_HASH_WORKERS = 2
+_password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS,
+                                        thread_name_prefix='password-hash')
+
 def hash_password(password):
-    """Hash a password for storing."""
-    return hashlib.sha256(password.encode()).hexdigest()
+    """Hash a password for storing.
+
+    Format: scrypt$<n>$<r>$<p>$<salt hex>$<hash hex>
+    """
+    salt = secrets.token_bytes(16)
+    digest = hashlib.scrypt(password.encode(), salt=salt, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P)
+    return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${salt.hex()}${digest.hex()}"
+
+def is_legacy_password_hash(stored_hash):
+    """True for the unsalted SHA-256 hashes written by older versions"""
+    return not stored_hash.startswith('scrypt$')
+
+def verify_password(stored_hash, password):
+    """Check a password against a stored scrypt or legacy SHA-256 hash"""
+    if is_legacy_password_hash(stored_hash):
+        candidate = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(stored_hash, candidate)
+    
+    try:
+        _, n, r, p, salt_hex, digest_hex = stored_hash.split('$')
+        expected = bytes.fromhex(digest_hex)
+        candidate = hashlib.scrypt(password.encode(), salt=bytes.fromhex(salt_hex),
+                                   n=int(n), r=int(r), p=int(p), dklen=len(expected))
+    except ValueError:
+        return False
+    return hmac.compare_digest(candidate, expected)
+
+# Successful scrypt checks are remembered for a few minutes so repeated
+# logins don't pay the full key-derivation cost each time. Entries are keyed
+# by an HMAC of the stored hash and password, so no plaintext is kept and a
+# password change invalidates them. Failures are never cached.
+VERIFIED_LOGIN_TTL = 300
+VERIFIED_LOGIN_MAX = 256
+_verified_logins = {}
+
+def verify_password_cached(stored_hash, password):
+    key = hmac.new(app.secret_key.encode(), f"{stored_hash}\0{password}".encode(), hashlib.sha256).digest()
+    now = time.monotonic()
+    expires = _verified_logins.get(key)
+    if expires and expires > now:
+        return True
+    
+    if not _password_executor.submit(verify_password, stored_hash, password).result():
+        return False
+    
+    if len(_verified_logins) >= VERIFIED_LOGIN_MAX:
+        _verified_logins.clear()
+    _verified_logins[key] = now + VERIFIED_LOGIN_TTL
+    return True
 
 def init_database():
     """Initialize the database with proper persistence"""
     conn = get_db_connection()
     
     try:
-        # Check if we're using PostgreSQL
-        is_postgres = 'postgresql' in str(conn)
+        c = conn.cursor()
+        
+        # Skip the whole setup when this database is already at SCHEMA_VERSION
+        c.execute('CREATE TABLE IF NOT EXISTS schema_meta (version INTEGER NOT NULL)')
+        c.execute('SELECT version FROM schema_meta')
+        row = c.fetchone()
+        if row and row[0] >= SCHEMA_VERSION:
+            if not IS_POSTGRES:
+                c.execute('PRAGMA optimize')
+            conn.commit()
+            logger.info(f"✅ Database schema is current (version {row[0]})")
+            return
         
-        if is_postgres:
+        if IS_POSTGRES:
+            from psycopg2.extras import execute_values
             logger.info("🔗 Using PostgreSQL database")
-            c = conn.cursor()
             
             # Enable UUID extension if needed
             c.execute("CREATE EXTENSION IF NOT EXISTS \"uuid-ossp\";")
@@ -3076,7 +3839,6 @@ def init_database():
             
         else:
             logger.info("🔗 Using SQLite database with persistence")
-            c = conn.cursor()
             
             # Create tables with SQLite syntax
             c.execute('''
@@ -3160,6 +3922,22 @@ def init_database():
                  timestamp DATETIME DEFAULT CURRENT_TIMESTAMP)
             ''')
         
+        # Transaction listings read newest first
+        c.execute('CREATE INDEX IF NOT EXISTS idx_transactions_timestamp ON transactions (timestamp DESC)')
+        # Assembly orders are joined to their work order on every broadcast
+        c.execute('CREATE INDEX IF NOT EXISTS idx_assembly_orders_work_order ON assembly_orders (work_order_id)')
+        # Active work orders are listed by set type then age on every broadcast
+        c.execute('CREATE INDEX IF NOT EXISTS idx_work_orders_status ON work_orders (status, set_type, created_at)')
+        # Assembly queue is ordered by status, newest move first within each
+        c.execute('CREATE INDEX IF NOT EXISTS idx_assembly_orders_status ON assembly_orders (status, moved_at DESC)')
+        # Station views list items by case type then name; the composite index
+        # also serves case_type-only lookups, so it replaces the single-column one
+        c.execute('DROP INDEX IF EXISTS idx_items_case_type')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_items_case_type_name ON items (case_type, name)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_external_work_orders_created ON external_work_orders (created_at DESC)')
+        # Recent chat is read newest first with id as the tie-breaker
+        c.execute('CREATE INDEX IF NOT EXISTS idx_chat_messages_timestamp ON chat_messages (timestamp DESC, id DESC)')
+        
         # Add initial brackets with updated names
         initial_items = [
             ('H6-623A', 'H6 Bracket 623A', 'H6', 15, 10),
@@ -3173,11 +3951,10 @@ def init_database():
             ('H9-SPACER', 'H9 Spacer (Optional)', 'H9', 25, 10)
         ]
         
-        for item in initial_items:
-            if is_postgres:
-                c.execute('INSERT INTO items (name, description, case_type, quantity, min_stock) VALUES (%s, %s, %s, %s, %s) ON CONFLICT (name) DO NOTHING', item)
-            else:
-                c.execute('INSERT OR IGNORE INTO items (name, description, case_type, quantity, min_stock) VALUES (?, ?, ?, ?, ?)', item)
+        if IS_POSTGRES:
+            execute_values(c, 'INSERT INTO items (name, description, case_type, quantity, min_stock) VALUES %s ON CONFLICT (name) DO NOTHING', initial_items)
+        else:
+            c.executemany('INSERT OR IGNORE INTO items (name, description, case_type, quantity, min_stock) VALUES (?, ?, ?, ?, ?)', initial_items)
         
         # Add sample work orders
         sample_work_orders = [
@@ -3187,11 +3964,10 @@ def init_database():
             ('WO-004', 'H9', 8, True)
         ]
         
-        for wo in sample_work_orders:
-            if is_postgres:
-                c.execute('INSERT INTO work_orders (order_number, set_type, required_sets, include_spacer) VALUES (%s, %s, %s, %s) ON CONFLICT DO NOTHING', wo)
-            else:
-                c.execute('INSERT OR IGNORE INTO work_orders (order_number, set_type, required_sets, include_spacer) VALUES (?, ?, ?, ?)', wo)
+        if IS_POSTGRES:
+            execute_values(c, 'INSERT INTO work_orders (order_number, set_type, required_sets, include_spacer) VALUES %s ON CONFLICT DO NOTHING', sample_work_orders)
+        else:
+            c.executemany('INSERT OR IGNORE INTO work_orders (order_number, set_type, required_sets, include_spacer) VALUES (?, ?, ?, ?)', sample_work_orders)
         
         # Add default users
         default_users = [
@@ -3200,33 +3976,33 @@ def init_database():
             ('viewer', hash_password('viewer123'), 'viewer')
         ]
         
-        for user in default_users:
-            if is_postgres:
-                c.execute('INSERT INTO users (username, password_hash, role) VALUES (%s, %s, %s) ON CONFLICT (username) DO NOTHING', user)
-            else:
-                c.execute('INSERT OR IGNORE INTO users (username, password_hash, role) VALUES (?, ?, ?)', user)
+        if IS_POSTGRES:
+            execute_values(c, 'INSERT INTO users (username, password_hash, role) VALUES %s ON CONFLICT (username) DO NOTHING', default_users)
+        else:
+            c.executemany('INSERT OR IGNORE INTO users (username, password_hash, role) VALUES (?, ?, ?)', default_users)
         
         # Add default settings
         default_settings = [
             ('low_stock_threshold', '5'),
             ('critical_stock_threshold', '2'),
             ('slack_webhook_url', SLACK_WEBHOOK_URL),
-            ('sku_mapping', json.dumps(SKU_BRACKET_MAPPING)),
-            ('sku_set_mapping', json.dumps(SKU_SET_MAPPING))
+            ('sku_mapping', app.json.dumps(SKU_BRACKET_MAPPING)),
+            ('sku_set_mapping', app.json.dumps(SKU_SET_MAPPING))
         ]
         
-        for setting in default_settings:
-            if is_postgres:
-                c.execute('INSERT INTO settings (key, value) VALUES (%s, %s) ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value', setting)
-            else:
-                c.execute('INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)', setting)
+        if IS_POSTGRES:
+            execute_values(c, 'INSERT INTO settings (key, value) VALUES %s ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value', default_settings)
+        else:
+            c.executemany('INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)', default_settings)
         
         # Add welcome chat message
         welcome_message = ('System', 'Welcome to the Bracket Inventory Tracker! Use this chat to communicate with your team.')
-        if is_postgres:
-            c.execute('INSERT INTO chat_messages (sender, message) VALUES (%s, %s)', welcome_message)
-        else:
-            c.execute('INSERT INTO chat_messages (sender, message) VALUES (?, ?)', welcome_message)
+        conn.execute('INSERT INTO chat_messages (sender, message) VALUES (?, ?)', welcome_message)
+        
+        c.execute('DELETE FROM schema_meta')
+        conn.execute('INSERT INTO schema_meta (version) VALUES (?)', (SCHEMA_VERSION,))
+        if not IS_POSTGRES:
+            c.execute('PRAGMA optimize')
         
         conn.commit()
         logger.info("✅ Database initialized successfully with persistent storage")
@@ -3236,86 +4012,142 @@ def init_database():
         conn.rollback()
         raise
     finally:
-        conn.close()
+        release_db_connection(conn)
 
-def get_setting(key, default=None):
-    conn = get_db_connection()
-    is_postgres = 'postgresql' in str(conn)
+# Settings change rarely but are read on most request paths, so the whole
+# table is loaded in one query and kept in memory for SETTINGS_CACHE_TTL
+# seconds. update_setting() expires the snapshot, which keeps this process
+# consistent immediately. JSON-valued settings are parsed once per snapshot.
+#
+# _settings_lock guards the snapshot state and is only held briefly;
+# _settings_reload_lock lets one thread run the query at a time. Every
+# invalidation bumps _settings_generation, and a reload that started before
+# the bump returns what it read without publishing it as fresh.
+SETTINGS_CACHE_TTL = 30
+_settings_cache = {}
+_settings_cache_ts = 0.0
+_settings_generation = 0
+_parsed_settings = {}
+_settings_lock = threading.Lock()
+_settings_reload_lock = threading.Lock()
+
+def _load_settings():
+    global _settings_cache, _settings_cache_ts, _parsed_settings
     
-    try:
-        if is_postgres:
-            setting = conn.execute('SELECT value FROM settings WHERE key = %s', (key,)).fetchone()
-        else:
-            setting = conn.execute('SELECT value FROM settings WHERE key = ?', (key,)).fetchone()
+    if time.monotonic() - _settings_cache_ts < SETTINGS_CACHE_TTL:
+        return _settings_cache
+    
+    # One thread reloads; others that hit the expired snapshot at the same
+    # moment wait and reuse its result instead of each querying
+    with _settings_reload_lock:
+        with _settings_lock:
+            if time.monotonic() - _settings_cache_ts < SETTINGS_CACHE_TTL:
+                return _settings_cache
+            generation = _settings_generation
         
-        return setting['value'] if setting else default
-    finally:
-        conn.close()
+        conn = get_db_connection()
+        try:
+            rows = conn.execute('SELECT key, value FROM settings').fetchall()
+        finally:
+            release_db_connection(conn)
+        settings = {row['key']: row['value'] for row in rows}
+        
+        with _settings_lock:
+            if generation != _settings_generation:
+                # A setting changed while we were reading; leave the snapshot
+                # expired so the next call reads it again
+                return settings
+            
+            # Swap in fresh dicts rather than mutating so concurrent readers
+            # always see a complete snapshot
+            _settings_cache = settings
+            _parsed_settings = {}
+            _settings_cache_ts = time.monotonic()
+            return settings
+
+def _invalidate_settings():
+    """Expire the settings snapshot and any reload already in flight"""
+    global _settings_cache_ts, _settings_generation, _parsed_settings
+    
+    with _settings_lock:
+        _settings_generation += 1
+        _settings_cache_ts = 0.0
+        _parsed_settings = {}
+
+def get_setting(key, default=None):
+    value = _load_settings().get(key)
+    return value if value is not None else default
+
+def get_settings(defaults):
+    """Several settings at once from one snapshot, as {key: value or default}"""
+    settings = _load_settings()
+    return {key: settings.get(key) if settings.get(key) is not None else default
+            for key, default in defaults.items()}
+
+def get_json_setting(key, fallback):
+    """Parsed JSON setting, decoded once per settings snapshot"""
+    settings = _load_settings()
+    parsed = _parsed_settings
+    if key not in parsed:
+        try:
+            parsed[key] = app.json.loads(settings.get(key) or '{}')
+        except (TypeError, ValueError):
+            parsed[key] = fallback
+    return parsed[key]
 
 def update_setting(key, value):
     conn = get_db_connection()
-    is_postgres = 'postgresql' in str(conn)
     
     try:
-        if is_postgres:
-            conn.execute('INSERT INTO settings (key, value) VALUES (%s, %s) ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value', (key, value))
-        else:
-            conn.execute('INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)', (key, value))
+        # Upsert syntax shared by PostgreSQL and SQLite 3.24+; an unchanged
+        # value leaves the existing row untouched instead of rewriting it
+        conn.execute(
+            'INSERT INTO settings (key, value) VALUES (?, ?) '
+            'ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value '
+            'WHERE settings.value <> EXCLUDED.value',
+            (key, value)
+        )
         
         conn.commit()
+        _invalidate_settings()
     finally:
-        conn.close()
+        release_db_connection(conn)
 
 def get_sku_mapping():
     """Get SKU to bracket mapping from settings"""
-    mapping_json = get_setting('sku_mapping', '{}')
-    try:
-        return json.loads(mapping_json)
-    except:
-        return SKU_BRACKET_MAPPING
+    return get_json_setting('sku_mapping', SKU_BRACKET_MAPPING)
 
 def get_sku_set_mapping():
     """Get SKU to set type mapping from settings"""
-    mapping_json = get_setting('sku_set_mapping', '{}')
-    try:
-        return json.loads(mapping_json)
-    except:
-        return SKU_SET_MAPPING
+    return get_json_setting('sku_set_mapping', SKU_SET_MAPPING)
+
+# PST is UTC-8 (no DST handling for simplicity)
+PST = timezone(timedelta(hours=-8))
 
 def get_pst_time():
     """Get current time in PST timezone without pytz dependency"""
-    utc_now = datetime.now(timezone.utc)
-    # PST is UTC-8 (no DST handling for simplicity)
-    pst_offset = timedelta(hours=-8)
-    pst_time = utc_now + pst_offset
-    return pst_time.strftime("%I:%M:%S %p").lstrip('0')
+    return datetime.now(PST).strftime("%I:%M:%S %p").lstrip('0')
 
-def send_slack_notification(message):
-    """Send notification to Slack with improved error handling"""
-    webhook_url = get_setting('slack_webhook_url')
-    if not webhook_url:
-        logger.info("❌ No Slack webhook URL configured")
-        return False
-    
-    # Validate webhook URL format
-    if not webhook_url.startswith('https://hooks.slack.com/services/'):
-        logger.error("❌ Invalid Slack webhook URL format")
-        return False
-    
+# Slack posts are handed to a background worker so socket handlers and
+# routes never wait on the webhook. Messages queued while a post is in flight
+# are sent together as one message per webhook.
+SLACK_BATCH_SEPARATOR = '\n---\n'
+SLACK_PAYLOAD_DEFAULTS = {
+    "username": "Bracket Inventory Tracker",
+    "icon_emoji": ":package:"
+}
+# One session keeps the TLS connection to Slack alive between posts
+slack_session = requests.Session()
+slack_session.headers.update({'Content-Type': 'application/json'})
+_slack_queue = queue.Queue()
+
+def _post_to_slack(webhook_url, message):
     try:
-        payload = {
-            "text": message,
-            "username": "Bracket Inventory Tracker",
-            "icon_emoji": ":package:"
-        }
+        payload = {"text": message, **SLACK_PAYLOAD_DEFAULTS}
+        body = orjson.dumps(payload) if orjson is not None else json.dumps(payload).encode('utf-8')
         
         # Add timeout and better error handling
-        response = requests.post(
-            webhook_url, 
-            json=payload, 
-            timeout=10,
-            headers={'Content-Type': 'application/json'}
-        )
+        response = slack_session.post(webhook_url, data=body, timeout=10)
         
         if response.status_code == 200:
             logger.info("✅ Slack notification sent successfully")
@@ -3335,102 +4167,159 @@ def send_slack_notification(message):
         logger.error(f"❌ Slack notification failed: {e}")
         return False
 
-def send_printing_notification(item_name, change, new_quantity):
-    """Send notification for printing station updates"""
-    message = f":printer: *PRINTING STATION UPDATE*\n\n"
-    message += f"*Component:* {item_name}\n"
-    message += f"*Added Quantity:* +{change} units\n"
-    message += f"*New Total:* {new_quantity} units\n\n"
-    message += f"Inventory updated via Printing Station"
+def _slack_worker():
+    """Drain the Slack queue; a None entry stops the worker after flushing"""
+    while True:
+        batch = [_slack_queue.get()]
+        while True:
+            try:
+                batch.append(_slack_queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        by_webhook = {}
+        for entry in batch:
+            if entry is not None:
+                webhook_url, message = entry
+                by_webhook.setdefault(webhook_url, []).append(message)
+        
+        for webhook_url, messages in by_webhook.items():
+            _post_to_slack(webhook_url, SLACK_BATCH_SEPARATOR.join(messages))
+        
+        if None in batch:
+            return
+
+_slack_thread = threading.Thread(target=_slack_worker, name='slack-notifier', daemon=True)
+_slack_thread.start()
+
+def flush_slack_notifications(timeout=10):
+    """Send anything still queued before the process exits"""
+    _slack_queue.put(None)
+    _slack_thread.join(timeout)
+
+atexit.register(flush_slack_notifications)
+
+def slack_configured():
+    """Cheap check callers use before building a message nobody will receive"""
+    return bool(get_setting('slack_webhook_url'))
+
+@lru_cache(maxsize=8)
+def is_slack_webhook_url(url):
+    return url.startswith('https://hooks.slack.com/services/')
+
+def send_slack_notification(message):
+    """Queue a Slack notification.
+
+    Returns True once the message is queued; delivery errors are logged by
+    the worker.
+    """
+    webhook_url = get_setting('slack_webhook_url')
+    if not webhook_url:
+        logger.info("❌ No Slack webhook URL configured")
+        return False
     
-    return send_slack_notification(message)
+    # Validate webhook URL format
+    if not is_slack_webhook_url(webhook_url):
+        logger.error("❌ Invalid Slack webhook URL format")
+        return False
+    
+    _slack_queue.put((webhook_url, message))
+    return True
+
+def printing_message(item_name, change, new_quantity):
+    """Slack text for printing station updates"""
+    return "\n".join([
+        ":printer: *PRINTING STATION UPDATE*",
+        "",
+        f"*Component:* {item_name}",
+        f"*Added Quantity:* +{change} units",
+        f"*New Total:* {new_quantity} units",
+        "",
+        "Inventory updated via Printing Station",
+    ])
 
-def send_inventory_change_notification(item_name, change, station, notes=""):
-    """Send notification for any inventory change"""
+def inventory_change_message(item_name, change, station, notes=""):
+    """Slack text for any inventory change"""
     action_emoji = "📈" if change > 0 else "📉"
     action_type = "ADDED" if change > 0 else "REMOVED"
     
-    message = f"{action_emoji} *INVENTORY UPDATE - {action_type}*\n\n"
-    message += f"*Component:* {item_name}\n"
-    message += f"*Quantity Change:* {change:+d} units\n"
-    message += f"*Station:* {station}\n"
-    
+    parts = [
+        f"{action_emoji} *INVENTORY UPDATE - {action_type}*",
+        "",
+        f"*Component:* {item_name}",
+        f"*Quantity Change:* {change:+d} units",
+        f"*Station:* {station}",
+    ]
     if notes:
-        message += f"*Notes:* {notes}\n"
-    
-    message += f"\nInventory has been updated"
+        parts.append(f"*Notes:* {notes}")
+    parts += ["", "Inventory has been updated"]
+    return "\n".join(parts)
+
+def stock_alert_message(item_name, new_quantity):
+    """Slack text for a low or critical stock level, or None when stock is fine"""
+    thresholds = get_settings({'low_stock_threshold': 5, 'critical_stock_threshold': 2})
+    low_threshold = int(thresholds['low_stock_threshold'])
+    critical_threshold = int(thresholds['critical_stock_threshold'])
     
-    return send_slack_notification(message)
+    if new_quantity <= critical_threshold:
+        return f"🔴 *CRITICAL STOCK ALERT*\n\n*Component:* {item_name}\n*Current Stock:* {new_quantity} units\n*Critical Threshold:* {critical_threshold} units\n\n*Action Required:* Please restock immediately!"
+    if new_quantity <= low_threshold:
+        return f"🟡 *LOW STOCK WARNING*\n\n*Component:* {item_name}\n*Current Stock:* {new_quantity} units\n*Low Threshold:* {low_threshold} units\n\n*Action Suggested:* Consider restocking soon."
+    return None
+
+# Columns the client actually renders for each part of the inventory snapshot
+INVENTORY_QUERIES = {
+    'items': 'SELECT id, name, description, case_type, quantity, min_stock FROM items ORDER BY name',
+    'work_orders': """
+        SELECT id, order_number, set_type, required_sets, include_spacer, status
+        FROM work_orders WHERE status = 'active' ORDER BY set_type, created_at
+    """,
+    'assembly_orders': """
+        SELECT ao.id, ao.work_order_id, ao.status, ao.moved_at,
+               wo.order_number, wo.set_type, wo.required_sets, wo.include_spacer
+        FROM assembly_orders ao
+        JOIN work_orders wo ON ao.work_order_id = wo.id
+        ORDER BY 
+            CASE WHEN ao.status = 'ready' THEN 1
+                 WHEN ao.status = 'building' THEN 2
+                 WHEN ao.status = 'completed' THEN 3
+                 ELSE 4 END,
+        ao.moved_at DESC
+    """,
+}
 
-def broadcast_update():
-    """Broadcast inventory updates to all connected clients"""
+def broadcast_update(room=None):
+    """Broadcast inventory updates to connected clients.
+
+    ``room`` limits the emit to one client or room. Returns the payload
+    (or None on error).
+    """
     conn = get_db_connection()
-    is_postgres = 'postgresql' in str(conn)
     
     try:
-        items = conn.execute('SELECT * FROM items ORDER BY name').fetchall()
-        
-        if is_postgres:
-            recent_activity = conn.execute('''
-                SELECT t.*, i.name as item_name 
-                FROM transactions t 
-                JOIN items i ON t.item_id = i.id 
-                ORDER BY t.timestamp DESC 
-                LIMIT 10
-            ''').fetchall()
-            
-            work_orders = conn.execute("SELECT * FROM work_orders WHERE status = 'active' ORDER BY set_type, created_at").fetchall()
-            
-            assembly_orders = conn.execute('''
-                SELECT ao.*, wo.order_number, wo.set_type, wo.required_sets, wo.include_spacer
-                FROM assembly_orders ao
-                JOIN work_orders wo ON ao.work_order_id = wo.id
-                ORDER BY 
-                    CASE WHEN ao.status = 'ready' THEN 1
-                         WHEN ao.status = 'building' THEN 2
-                         WHEN ao.status = 'completed' THEN 3
-                         ELSE 4 END,
-                ao.moved_at DESC
-            ''').fetchall()
-        else:
-            recent_activity = conn.execute('''
-                SELECT t.*, i.name as item_name 
-                FROM transactions t 
-                JOIN items i ON t.item_id = i.id 
-                ORDER BY t.timestamp DESC 
-                LIMIT 10
-            ''').fetchall()
-            
-            work_orders = conn.execute("SELECT * FROM work_orders WHERE status = 'active' ORDER BY set_type, created_at").fetchall()
-            
-            assembly_orders = conn.execute('''
-                SELECT ao.*, wo.order_number, wo.set_type, wo.required_sets, wo.include_spacer
-                FROM assembly_orders ao
-                JOIN work_orders wo ON ao.work_order_id = wo.id
-                ORDER BY 
-                    CASE WHEN ao.status = 'ready' THEN 1
-                         WHEN ao.status = 'building' THEN 2
-                         WHEN ao.status = 'completed' THEN 3
-                         ELSE 4 END,
-                ao.moved_at DESC
-            ''').fetchall()
-        
-        items_data = [dict(item) for item in items]
-        activity_data = [dict(act) for act in recent_activity]
-        work_orders_data = [dict(wo) for wo in work_orders]
-        assembly_orders_data = [dict(ao) for ao in assembly_orders]
-        
-        socketio.emit('inventory_update', {
-            'items': items_data,
-            'recent_activity': activity_data,
-            'work_orders': work_orders_data,
-            'assembly_orders': assembly_orders_data
-        })
+        payload = {
+            scope: fetch_dicts(conn.execute(sql))
+            for scope, sql in INVENTORY_QUERIES.items()
+        }
+        socketio.emit('inventory_update', payload, room=room)
+        return payload
         
     except Exception as e:
         logger.error(f"Error broadcasting update: {e}")
     finally:
-        conn.close()
+        release_db_connection(conn)
+
+def to_columnar(rows, columns):
+    """Pack rows as {'cols': [...], 'rows': [[...], ...]} instead of one object
+    per row, so column names are sent once rather than repeated for every record
+    """
+    return {'cols': list(columns), 'rows': [[row[col] for col in columns] for row in rows]}
+
+def conditional_json(payload):
+    """jsonify() with an ETag, answering 304 when it matches If-None-Match"""
+    response = jsonify(payload)
+    response.add_etag()
+    return response.make_conditional(request)
 
 # Authentication decorators
 def login_required(f):
@@ -3453,11 +4342,134 @@ def role_required(role):
         return decorated_function
     return decorator
 
+# Chat messages are persisted by a background writer, which commits whatever
+# has queued up in one transaction instead of one commit per message. Each
+# message is broadcast only after its batch commits, so clients that refetch
+# the chat list on the event always find it stored.
+CHAT_WRITE_BATCH = 100
+CHAT_SAVE_TIMEOUT = 5
+_chat_queue = queue.Queue()
+
+def _save_chat_batch(entries):
+    """Insert one batch of queued messages; True when it committed"""
+    conn = None
+    try:
+        conn = get_db_connection()
+        conn.executemany(
+            'INSERT INTO chat_messages (sender, message, timestamp) VALUES (?, ?, ?)',
+            [entry['row'] for entry in entries]
+        )
+        conn.commit()
+        return True
+    except Exception as e:
+        logger.error(f"❌ Error saving chat messages: {str(e)}")
+        return False
+    finally:
+        # release_db_connection() rolls back anything left uncommitted
+        if conn is not None:
+            release_db_connection(conn)
+
+def _chat_writer():
+    """Persist queued chat messages; a None entry stops the writer"""
+    while True:
+        batch = [_chat_queue.get()]
+        while len(batch) < CHAT_WRITE_BATCH:
+            try:
+                batch.append(_chat_queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        try:
+            entries = [entry for entry in batch if entry is not None]
+            if entries:
+                saved = _save_chat_batch(entries)
+                for entry in entries:
+                    entry['saved'] = saved
+                    entry['done'].set()
+                    if saved:
+                        socketio.emit('chat_message', entry['payload'])
+        except Exception as e:
+            logger.error(f"❌ Chat writer error: {str(e)}")
+        finally:
+            # Always account for the batch so waiters see the queue drain
+            for _ in batch:
+                _chat_queue.task_done()
+        
+        if None in batch:
+            return
+
+_chat_thread = threading.Thread(target=_chat_writer, name='chat-writer', daemon=True)
+_chat_thread.start()
+
+def flush_chat_messages(timeout=10):
+    """Write anything still queued before the process exits"""
+    _chat_queue.put(None)
+    _chat_thread.join(timeout)
+
+atexit.register(flush_chat_messages)
+
+def wait_for_chat_writes(timeout=CHAT_SAVE_TIMEOUT):
+    """Wait up to ``timeout`` seconds for queued chat messages to be written.
+
+    Unlike ``_chat_queue.join()`` this gives up if the writer is stuck on the
+    database or has already stopped; returns whether the queue drained.
+    """
+    deadline = time.monotonic() + timeout
+    with _chat_queue.all_tasks_done:
+        while _chat_queue.unfinished_tasks:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            _chat_queue.all_tasks_done.wait(remaining)
+    return True
+
+# (epoch second, local ISO prefix, UTC storage string) for the last second a
+# chat message was posted; both strings only change once per second
+_chat_clock = (None, '', '')
+
+def chat_timestamps():
+    """Local ISO timestamp for the broadcast and UTC string for storage"""
+    global _chat_clock
+    now = time.time()
+    second = int(now)
+    clock = _chat_clock
+    if clock[0] != second:
+        clock = (second,
+                 time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(second)),
+                 # Same UTC format as the column's CURRENT_TIMESTAMP default
+                 time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(second)))
+        _chat_clock = clock
+    return f"{clock[1]}.{int((now - second) * 1_000_000):06d}", clock[2]
+
+def post_chat_message(sender, message, wait=False):
+    """Queue a chat message for storage; it is broadcast once committed.
+
+    With ``wait`` the call blocks for up to CHAT_SAVE_TIMEOUT seconds and
+    returns whether the message was saved, or None if it is still queued and
+    may yet be saved. Without ``wait`` it returns True once queued.
+    """
+    sent_at, stored_at = chat_timestamps()
+    entry = {
+        'row': (sender, message, stored_at),
+        'payload': {'sender': sender, 'message': message, 'timestamp': sent_at},
+        'done': threading.Event(),
+        'saved': False
+    }
+    _chat_queue.put(entry)
+    
+    if not wait:
+        return True
+    if not entry['done'].wait(CHAT_SAVE_TIMEOUT):
+        return None
+    return entry['saved']
+
 # SocketIO events
 @socketio.on('connect')
 def handle_connect():
     logger.info(f"🔗 Client connected: {request.sid}")
-    broadcast_update()
+    # Only the new client needs a snapshot; build it off the handshake so the
+    # connection is acknowledged without waiting on the queries
+    socketio.start_background_task(broadcast_update, room=request.sid)
 
 @socketio.on('inventory_change')
 @login_required
@@ -3477,72 +4489,74 @@ def handle_inventory_change(data):
             socketio.emit('error', {'message': 'Item ID is required'}, room=request.sid)
             return
         
+        # int() would silently truncate 1.7 to 1, so non-whole floats and
+        # booleans are rejected before coercing
+        try:
+            if isinstance(change, bool) or (isinstance(change, float) and not change.is_integer()):
+                raise ValueError(change)
+            change = int(change)
+        except (TypeError, ValueError, OverflowError):
+            socketio.emit('error', {'message': 'Change must be a whole number'}, room=request.sid)
+            return
+        
         conn = get_db_connection()
-        is_postgres = 'postgresql' in str(conn)
         
         try:
-            if is_postgres:
-                item = conn.execute('SELECT * FROM items WHERE id = %s', (item_id,)).fetchone()
-            else:
-                item = conn.execute('SELECT * FROM items WHERE id = ?', (item_id,)).fetchone()
+            # Apply the change and read the result in one atomic statement so
+            # concurrent updates from other stations can't be lost
+            item = conn.execute(
+                'UPDATE items SET quantity = quantity + ? WHERE id = ? AND quantity + ? >= 0 RETURNING id, name, quantity',
+                (change, item_id, change)
+            ).fetchone()
             
             if not item:
-                socketio.emit('error', {'message': 'Item not found'}, room=request.sid)
-                return
-            
-            new_quantity = item['quantity'] + change
-            
-            if new_quantity < 0:
-                socketio.emit('error', {
-                    'message': f'Cannot remove {abs(change)}. Only {item["quantity"]} available.'
-                }, room=request.sid)
+                # Nothing updated: either the item is gone or stock is too low
+                current = conn.execute('SELECT quantity FROM items WHERE id = ?', (item_id,)).fetchone()
+                if not current:
+                    socketio.emit('error', {'message': 'Item not found'}, room=request.sid)
+                else:
+                    socketio.emit('error', {
+                        'message': f'Cannot remove {abs(change)}. Only {current["quantity"]} available.'
+                    }, room=request.sid)
                 return
             
-            if is_postgres:
-                conn.execute('UPDATE items SET quantity = %s WHERE id = %s', (new_quantity, item_id))
+            new_quantity = item['quantity']
+            
+            # Record transaction with username
+            # timestamp is filled by the column's CURRENT_TIMESTAMP default
+            conn.execute('''
+                INSERT INTO transactions (item_id, change, station, notes, username)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (item_id, change, station, notes, session['username']))
+            
+            # One Slack message per change, with any stock alert appended
+            message = None
+            if slack_configured():
+                if station == 'Printing Station':
+                    message = printing_message(item['name'], change, new_quantity)
+                else:
+                    message = inventory_change_message(item['name'], change, station, notes)
                 
-                # Record transaction with username
-                conn.execute('''
-                    INSERT INTO transactions (item_id, change, station, notes, username, timestamp)
-                    VALUES (%s, %s, %s, %s, %s, %s)
-                ''', (item_id, change, station, notes, session['username'], datetime.now()))
-            else:
-                conn.execute('UPDATE items SET quantity = ? WHERE id = ?', (new_quantity, item_id))
-                
-                # Record transaction with username
-                conn.execute('''
-                    INSERT INTO transactions (item_id, change, station, notes, username, timestamp)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (item_id, change, station, notes, session['username'], datetime.now()))
-            
-            # Send Slack notification for inventory changes
-            if station == 'Printing Station':
-                send_printing_notification(item['name'], change, new_quantity)
-            else:
-                send_inventory_change_notification(item['name'], change, station, notes)
+                alert = stock_alert_message(item['name'], new_quantity)
+                if alert:
+                    message += f"\n\n{alert}"
             
-            # Check for low stock and send additional Slack notification
-            low_threshold = int(get_setting('low_stock_threshold', 5))
-            critical_threshold = int(get_setting('critical_stock_threshold', 2))
+            conn.commit()
+            logger.info(f"📊 {session['username']} at {station}: {item['name']} {change:+d} = {new_quantity}")
             
-            if new_quantity <= critical_threshold:
-                message = f"🔴 *CRITICAL STOCK ALERT*\n\n*Component:* {item['name']}\n*Current Stock:* {new_quantity} units\n*Critical Threshold:* {critical_threshold} units\n\n*Action Required:* Please restock immediately!"
-                send_slack_notification(message)
-            elif new_quantity <= low_threshold:
-                message = f"🟡 *LOW STOCK WARNING*\n\n*Component:* {item['name']}\n*Current Stock:* {new_quantity} units\n*Low Threshold:* {low_threshold} units\n\n*Action Suggested:* Consider restocking soon."
+            # Only announce changes that actually committed
+            if message:
                 send_slack_notification(message)
             
-            conn.commit()
-            logger.info(f"📊 {session['username']} at {station}: {item['name']} {change:+d} = {new_quantity}")
+            # Clients patch the one item instead of reloading the inventory
+            socketio.emit('inventory_item:update', {'id': item['id'], 'quantity': new_quantity})
             
         except Exception as e:
             logger.error(f"Database error in inventory change: {e}")
             conn.rollback()
             socketio.emit('error', {'message': f'Database error: {str(e)}'}, room=request.sid)
         finally:
-            conn.close()
-        
-        broadcast_update()
+            release_db_connection(conn)
         
     except Exception as e:
         logger.error(f"Error in inventory_change: {str(e)}")
@@ -3558,37 +4572,8 @@ def handle_chat_message(data):
     if not message:
         return
     
-    conn = get_db_connection()
-    is_postgres = 'postgresql' in str(conn)
-    
-    try:
-        if is_postgres:
-            conn.execute(
-                'INSERT INTO chat_messages (sender, message) VALUES (%s, %s)',
-                (sender, message)
-            )
-        else:
-            conn.execute(
-                'INSERT INTO chat_messages (sender, message) VALUES (?, ?)',
-                (sender, message)
-            )
-        
-        conn.commit()
-        
-        # Broadcast the new message to all connected clients
-        socketio.emit('chat_message', {
-            'sender': sender,
-            'message': message,
-            'timestamp': datetime.now().isoformat()
-        })
-        
-        logger.info(f"💬 Chat message from {sender}: {message}")
-        
-    except Exception as e:
-        logger.error(f"❌ Error saving chat message: {str(e)}")
-        conn.rollback()
-    finally:
-        conn.close()
+    post_chat_message(sender, message)
+    logger.info(f"💬 Chat message from {sender}: {message}")
 
 @socketio.on('system_chat_message')
 def handle_system_chat_message(data):
@@ -3598,51 +4583,42 @@ def handle_system_chat_message(data):
     if not message:
         return
     
-    conn = get_db_connection()
-    is_postgres = 'postgresql' in str(conn)
-    
-    try:
-        if is_postgres:
-            conn.execute(
-                'INSERT INTO chat_messages (sender, message) VALUES (%s, %s)',
-                ('System', message)
-            )
-        else:
-            conn.execute(
-                'INSERT INTO chat_messages (sender, message) VALUES (?, ?)',
-                ('System', message)
-            )
-        
-        conn.commit()
-        
-        # Broadcast the system message to all connected clients
-        socketio.emit('chat_message', {
-            'sender': 'System',
-            'message': message,
-            'timestamp': datetime.now().isoformat()
-        })
-        
-        logger.info(f"🔔 System chat message: {message}")
-        
-    except Exception as e:
-        logger.error(f"❌ Error saving system chat message: {str(e)}")
-        conn.rollback()
-    finally:
-        conn.close()
+    post_chat_message('System', message)
+    logger.info(f"🔔 System chat message: {message}")
 
 # Flask routes
+# Compiled once; render_template_string() would re-parse and recompile the
+# whole page template on every request
+INDEX_TEMPLATE = app.jinja_env.from_string(HTML_TEMPLATE)
+
 @app.route('/')
 def index():
+    session_bootstrap = {
+        'username': session.get('username'),
+        'role': session.get('role')
+    }
+    
     if 'user_id' not in session:
-        return render_template_string(HTML_TEMPLATE, 
+        return render_template(INDEX_TEMPLATE, 
                                    slack_webhook=get_setting('slack_webhook_url', ''),
-                                   using_postgres='postgresql' in DATABASE_URL)
+                                   using_postgres=IS_POSTGRES,
+                                   session_bootstrap=session_bootstrap,
+                                   app_script_version=APP_SCRIPT_VERSION)
     
-    return render_template_string(HTML_TEMPLATE, 
+    return render_template(INDEX_TEMPLATE, 
                                 username=session['username'],
                                 role=session['role'],
                                 slack_webhook=get_setting('slack_webhook_url', ''),
-                                using_postgres='postgresql' in DATABASE_URL)
+                                using_postgres=IS_POSTGRES,
+                                session_bootstrap=session_bootstrap,
+                                app_script_version=APP_SCRIPT_VERSION)
+
+@app.route('/app.js')
+def app_script():
+    """Serve the client script; the URL carries a content hash, so it can be cached indefinitely"""
+    response = app.response_class(APP_SCRIPT, mimetype='application/javascript')
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
 
 @app.route('/api/login', methods=['POST'])
 def login():
@@ -3654,15 +4630,16 @@ def login():
         return jsonify({'success': False, 'error': 'Username and password are required'})
     
     conn = get_db_connection()
-    is_postgres = 'postgresql' in str(conn)
     
     try:
-        if is_postgres:
-            user = conn.execute('SELECT * FROM users WHERE username = %s', (username,)).fetchone()
-        else:
-            user = conn.execute('SELECT * FROM users WHERE username = ?', (username,)).fetchone()
+        user = conn.execute('SELECT id, username, password_hash, role FROM users WHERE username = ?', (username,)).fetchone()
         
-        if user and user['password_hash'] == hash_password(password):
+        if user and verify_password_cached(user['password_hash'], password):
+            # Upgrade legacy SHA-256 hashes now that we know the password
+            if is_legacy_password_hash(user['password_hash']):
+                conn.execute('UPDATE users SET password_hash = ? WHERE id = ?', (_password_executor.submit(hash_password, password).result(), user['id']))
+                conn.commit()
+            
             session['user_id'] = user['id']
             session['username'] = user['username']
             session['role'] = user['role']
@@ -3670,7 +4647,7 @@ def login():
         else:
             return jsonify({'success': False, 'error': 'Invalid username or password'})
     finally:
-        conn.close()
+        release_db_connection(conn)
 
 @app.route('/api/logout')
 def logout():
@@ -3683,29 +4660,14 @@ def logout():
 def get_chat_messages():
     """Get recent chat messages"""
     conn = get_db_connection()
-    is_postgres = 'postgresql' in str(conn)
     
     try:
-        if is_postgres:
-            messages = conn.execute('''
-                SELECT * FROM chat_messages 
-                ORDER BY timestamp DESC 
-                LIMIT 50
-            ''').fetchall()
-        else:
-            messages = conn.execute('''
-                SELECT * FROM chat_messages 
-                ORDER BY timestamp DESC 
-                LIMIT 50
-            ''').fetchall()
+        messages = conn.execute(RECENT_CHAT_MESSAGES_SQL).fetchall()
+        messages_data = to_columnar(messages, CHAT_MESSAGE_COLUMNS)
         
-        messages_data = [dict(msg) for msg in messages]
-        # Reverse to show oldest first
-        messages_data.reverse()
-        
-        return jsonify({'success': True, 'messages': messages_data})
+        return conditional_json({'success': True, **messages_data})
     finally:
-        conn.close()
+        release_db_connection(conn)
 
 @app.route('/api/send_chat_message', methods=['POST'])
 @login_required
@@ -3717,57 +4679,30 @@ def send_chat_message():
     if not message:
         return jsonify({'success': False, 'error': 'Message cannot be empty'})
     
-    conn = get_db_connection()
-    is_postgres = 'postgresql' in str(conn)
-    
-    try:
-        if is_postgres:
-            conn.execute(
-                'INSERT INTO chat_messages (sender, message) VALUES (%s, %s)',
-                (session['username'], message)
-            )
-        else:
-            conn.execute(
-                'INSERT INTO chat_messages (sender, message) VALUES (?, ?)',
-                (session['username'], message)
-            )
-        
-        conn.commit()
-        
-        # Broadcast via SocketIO
-        socketio.emit('chat_message', {
-            'sender': session['username'],
-            'message': message,
-            'timestamp': datetime.now().isoformat()
-        })
-        
-        return jsonify({'success': True, 'message': 'Message sent'})
-        
-    except Exception as e:
-        conn.rollback()
-        return jsonify({'success': False, 'error': str(e)})
-    finally:
-        conn.close()
+    saved = post_chat_message(session['username'], message, wait=True)
+    if saved is None:
+        # Still queued; report it as such rather than inviting a duplicate retry
+        return jsonify({'success': True, 'message': 'Message queued'})
+    if not saved:
+        return jsonify({'success': False, 'error': 'Failed to save message'})
+    return jsonify({'success': True, 'message': 'Message sent'})
 
 @app.route('/api/clear_chat_history', methods=['POST'])
 @login_required
 @role_required('admin')
 def clear_chat_history():
     """Clear all chat messages"""
+    # Let queued messages land first so they don't reappear after the clear,
+    # but don't hold the request hostage to a stuck or stopped writer
+    if not wait_for_chat_writes():
+        logger.warning("⚠️ Chat writer did not drain before clearing history")
     conn = get_db_connection()
-    is_postgres = 'postgresql' in str(conn)
     
     try:
-        if is_postgres:
-            conn.execute('DELETE FROM chat_messages')
-            # Add a new welcome message
-            conn.execute('INSERT INTO chat_messages (sender, message) VALUES (%s, %s)', 
-                        ('System', 'Chat history has been cleared. Start a new conversation!'))
-        else:
-            conn.execute('DELETE FROM chat_messages')
-            # Add a new welcome message
-            conn.execute('INSERT INTO chat_messages (sender, message) VALUES (?, ?)', 
-                        ('System', 'Chat history has been cleared. Start a new conversation!'))
+        conn.execute('DELETE FROM chat_messages')
+        # Add a new welcome message
+        conn.execute('INSERT INTO chat_messages (sender, message) VALUES (?, ?)', 
+                    ('System', 'Chat history has been cleared. Start a new conversation!'))
         
         conn.commit()
         
@@ -3784,7 +4719,7 @@ def clear_chat_history():
         conn.rollback()
         return jsonify({'success': False, 'error': str(e)})
     finally:
-        conn.close()
+        release_db_connection(conn)
 
 # Work Order Analysis Route
 @app.route('/api/work_order_analysis', methods=['POST'])
@@ -3792,12 +4727,19 @@ def clear_chat_history():
 @role_required('operator')
 def work_order_analysis():
     """Generate and send work order analysis to Slack"""
+    if not slack_configured():
+        return jsonify({'success': False, 'error': 'Failed to send analysis to Slack'})
+    
     try:
         # This is a simplified version - you can expand this with your actual analysis logic
-        message = "🏭 *WORK ORDER ANALYSIS*\n\n"
-        message += "This feature analyzes current work orders and inventory status.\n"
-        message += "Detailed analysis would show what can be built vs what's missing.\n\n"
-        message += f"_Generated at {get_pst_time()}_"
+        message = "\n".join([
+            "🏭 *WORK ORDER ANALYSIS*",
+            "",
+            "This feature analyzes current work orders and inventory status.",
+            "Detailed analysis would show what can be built vs what's missing.",
+            "",
+            f"_Generated at {get_pst_time()}_",
+        ])
         
         if send_slack_notification(message):
             # Also send to chat
@@ -3822,10 +4764,7 @@ def work_order_analysis():
 @role_required('admin')
 def backup_database():
     """Create a backup of the database"""
-    conn = get_db_connection()
-    is_postgres = 'postgresql' in str(conn)
-    
-    if is_postgres:
+    if IS_POSTGRES:
         # For PostgreSQL, we can't easily create a downloadable backup
         # Instead, provide a data export
         return export_comprehensive_data()
@@ -3835,59 +4774,66 @@ def backup_database():
             return send_file('nzxt_inventory.db', as_attachment=True, download_name='inventory_backup.db')
         except Exception as e:
             return jsonify({'success': False, 'error': f'Backup failed: {str(e)}'})
-    finally:
-        conn.close()
+
+EXPORT_QUERIES = (
+    ('items', 'SELECT * FROM items'),
+    ('transactions', 'SELECT * FROM transactions ORDER BY timestamp DESC'),
+    ('work_orders', 'SELECT * FROM work_orders'),
+    ('external_orders', 'SELECT * FROM external_work_orders'),
+    ('assembly_orders', 'SELECT * FROM assembly_orders'),
+    ('users', 'SELECT id, username, role, created_at FROM users'),
+    ('settings', 'SELECT * FROM settings'),
+    ('chat_messages', 'SELECT * FROM chat_messages ORDER BY timestamp DESC LIMIT 1000'),
+)
+EXPORT_FETCH_SIZE = 1000
 
 def export_comprehensive_data():
-    """Export all data as a comprehensive JSON file"""
-    conn = get_db_connection()
+    """Export all data as a comprehensive JSON file.
+
+    The document is streamed table by table, EXPORT_FETCH_SIZE rows at a
+    time, so memory use doesn't grow with the size of the history.
+    """
+    def generate():
+        dumps = app.json.dumps
+        conn = get_db_connection()
+        try:
+            # Read every table from one snapshot so the export is consistent
+            # and SQLite sets up its read lock once instead of per query
+            if IS_POSTGRES:
+                conn.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY')
+            else:
+                conn.execute('BEGIN')
+            
+            yield '{"export_timestamp":' + dumps(datetime.now().isoformat())
+            for name, sql in EXPORT_QUERIES:
+                yield f',"{name}":['
+                cursor = conn.execute(sql)
+                separator = ''
+                while True:
+                    rows = fetch_dicts(cursor, EXPORT_FETCH_SIZE)
+                    if not rows:
+                        break
+                    yield separator + ','.join(map(dumps, rows))
+                    separator = ','
+                yield ']'
+            yield '}'
+        finally:
+            release_db_connection(conn)
     
-    try:
-        # Get all data
-        items = conn.execute('SELECT * FROM items').fetchall()
-        transactions = conn.execute('SELECT * FROM transactions ORDER BY timestamp DESC').fetchall()
-        work_orders = conn.execute('SELECT * FROM work_orders').fetchall()
-        external_orders = conn.execute('SELECT * FROM external_work_orders').fetchall()
-        assembly_orders = conn.execute('SELECT * FROM assembly_orders').fetchall()
-        users = conn.execute('SELECT id, username, role, created_at FROM users').fetchall()
-        settings = conn.execute('SELECT * FROM settings').fetchall()
-        chat_messages = conn.execute('SELECT * FROM chat_messages ORDER BY timestamp DESC LIMIT 1000').fetchall()
-        
-        # Convert to dictionaries
-        data = {
-            'export_timestamp': datetime.now().isoformat(),
-            'items': [dict(item) for item in items],
-            'transactions': [dict(t) for t in transactions],
-            'work_orders': [dict(wo) for wo in work_orders],
-            'external_orders': [dict(eo) for eo in external_orders],
-            'assembly_orders': [dict(ao) for ao in assembly_orders],
-            'users': [dict(user) for user in users],
-            'settings': [dict(setting) for setting in settings],
-            'chat_messages': [dict(msg) for msg in chat_messages]
-        }
-        
-        # Create JSON response
-        response = app.response_class(
-            json.dumps(data, indent=2),
-            mimetype='application/json',
-            headers={'Content-Disposition': 'attachment;filename=inventory_backup.json'}
-        )
-        
-        return response
-    finally:
-        conn.close()
+    return app.response_class(
+        stream_with_context(generate()),
+        mimetype='application/json',
+        headers={'Content-Disposition': 'attachment;filename=inventory_backup.json'}
+    )
 
 # Add this new route for database status
 @app.route('/api/database_status')
 @login_required
 def database_status():
     """Get database status information"""
-    db_path = get_database_path()
-    is_postgres = 'postgresql' in db_path
-    
     status_info = {
-        'type': 'PostgreSQL' if is_postgres else 'SQLite',
-        'path': db_path,
+        'type': 'PostgreSQL' if IS_POSTGRES else 'SQLite',
+        'path': DATABASE_PATH,
         'persistent': True
     }
     
@@ -3896,15 +4842,15 @@ def database_status():
 # Add this route to get current inventory for SocketIO
 @socketio.on('get_inventory')
 def handle_get_inventory():
-    """Handle request for current inventory"""
-    broadcast_update()
+    """Send the current inventory to the requesting client only"""
+    broadcast_update(room=request.sid)
 
 if __name__ == '__main__':
     print("🚀 Starting Bracket Inventory Tracker...")
     print("👨‍💻 Developed by Mark Calvo")
     print("🌐 Render.com Compatible Version 2.6")
     print("💾 Data Persistence Enabled")
-    print("🔗 Database:", "PostgreSQL" if 'postgresql' in DATABASE_URL else "SQLite")
+    print("🔗 Database:", "PostgreSQL" if IS_POSTGRES else "SQLite")
     
     # Initialize database
     init_database()
@@ -0,0 +1,23 @@
+import os
+import tempfile
+
+import pytest
+
+# app.py reads DATABASE_URL at import, so point it at a scratch SQLite file
+# before any test module imports it
+_db_dir = tempfile.mkdtemp(prefix='bracket-tracker-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+
+import app as app_module  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def app():
+    app_module.init_database()
+    app_module.app.config['TESTING'] = True
+    return app_module.app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,49 @@
+import hashlib
+
+import pytest
+
+from app import get_db_connection, hash_password, release_db_connection, verify_password
+
+
+def test_scrypt_round_trip():
+    stored = hash_password('s3cret')
+
+    assert stored.startswith('scrypt$')
+    assert verify_password(stored, 's3cret')
+    assert not verify_password(stored, 'wrong')
+    # Each hash gets its own salt
+    assert hash_password('s3cret') != stored
+
+
+def test_legacy_sha256_login_is_upgraded_to_scrypt(client):
+    legacy_hash = hashlib.sha256(b'legacy-pass').hexdigest()
+    conn = get_db_connection()
+    try:
+        conn.execute('INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)',
+                     ('legacy-user', legacy_hash, 'viewer'))
+        conn.commit()
+    finally:
+        release_db_connection(conn)
+
+    response = client.post('/api/login', json={'username': 'legacy-user', 'password': 'legacy-pass'})
+
+    assert response.get_json()['success'] is True
+    conn = get_db_connection()
+    try:
+        row = conn.execute('SELECT password_hash FROM users WHERE username = ?', ('legacy-user',)).fetchone()
+    finally:
+        release_db_connection(conn)
+    assert row['password_hash'].startswith('scrypt$')
+    assert verify_password(row['password_hash'], 'legacy-pass')
+
+
+@pytest.mark.parametrize('stored', [
+    'scrypt$',
+    'scrypt$16384$8$1$0011',
+    'scrypt$abc$8$1$00ff$00ff',
+    'scrypt$16384$8$1$not-hex$00ff',
+    'scrypt$16384$8$1$00ff$not-hex',
+    'scrypt$3$8$1$00ff$00ff',
+])
+def test_malformed_stored_hash_is_rejected(stored):
+    assert verify_password(stored, 'anything') is False